@@ -0,0 +1,71 @@
+"""
+Measure a backfill of many days of history, from the clone to the merge of the pull requests.
+
+The workflow runs offline like `bench_workflow.py`, against a local bare `origin` and the fake
+GitHub API. The history merged into `main` is then checked: one commit per sentence, dated
+within the backfilled range, with the data file cleaned each month.
+
+Usage: python benchmarks/bench_backfill.py --days 3650
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import date, timedelta
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_github import FakeGitHub
+from bench_workflow import prepare_origin, parse_option, OWNER, NAME
+from utils.generate_changes import GenerateChanges
+from utils.git_utils import GitUtils
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=3650, help="number of days backfilled, up to yesterday")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random generators")
+    parser.add_argument("--option", action="append", default=[], help="GenerateChanges argument e.g. segment_max_lines=1000, repeatable")
+    args = parser.parse_args()
+    options = dict(parse_option(option) for option in args.option)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    end_date = date.today() - timedelta(days=1)
+    start_date = end_date - timedelta(days=args.days - 1)
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        origin = prepare_origin(root)
+        with FakeGitHub({NAME: origin}) as fake:
+            random.seed(args.seed)
+            changes = GenerateChanges(
+                data_folder_name=str(root / "work"),
+                data_file_name="changes",
+                repository_url=origin.as_uri(),
+                user_email="super-dev@example.com",
+                github_access_token="token",
+                repository_owner=OWNER,
+                repository_name=NAME,
+                source_branch="feat/super-dev",
+                target_branch="develop",
+                prod_branch="main",
+                github_api_url=fake.url,
+                sentence_seed=args.seed,
+                **options
+            )
+            start = time.perf_counter()
+            changes.backfill_workflow(start_date, end_date)
+            duration = time.perf_counter() - start
+
+        log = GitUtils.run_command(["git", "log", "--first-parent", "develop^2", "--format=%at %ct %s"], cwd=origin)
+        commits = [line.split(" ", 2) for line in log.splitlines()][:-1]
+        dates = [int(author_date) for author_date, committer_date, _ in commits]
+        sentences = sum(not subject.endswith(("cleaned the file", "rolled over the file")) for _, _, subject in commits)
+        in_range = all(start_date.toordinal() <= date.fromtimestamp(timestamp).toordinal() <= end_date.toordinal() + 1 for timestamp in dates)
+        print(f"{args.days} days, {len(commits)} commits in {duration:.2f}s, {len(commits) / duration:.0f} commits/s")
+        print(f"Sentences committed: {sentences} of {changes.number_of_commits}, dates in range: {in_range}, "
+              f"author equals committer dates: {all(a == c for a, c, _ in commits)}")
+        sys.exit(0 if sentences == changes.number_of_commits and in_range else 1)
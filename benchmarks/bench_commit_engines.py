@@ -0,0 +1,85 @@
+"""
+Compare the `add_commit_push` loop with the `git fast-import` commit engine.
+
+Both engines commit the same sentences on top of the same base commit against a
+local bare repository used as `origin`, then the resulting histories are compared.
+
+Usage: python benchmarks/bench_commit_engines.py --commits 200
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from utils.git_utils import GitUtils
+
+
+def prepare_repository(root: Path, name: str) -> Path:
+    """
+    Create a bare `origin` repository and a configured clone with one commit on `main`.
+    """
+    remote = root / f"{name}.git"
+    local = root / name
+    GitUtils.run_command(["git", "init", "-q", "--bare", "-b", "main", str(remote)])
+    GitUtils.run_command(["git", "clone", "-q", str(remote), str(local)])
+    GitUtils.run_command(["git", "config", "user.name", GitUtils.USER_NAME], cwd=local)
+    GitUtils.run_command(["git", "config", "user.email", "bench@example.com"], cwd=local)
+    GitUtils.run_command(["git", "checkout", "-q", "-b", "main"], cwd=local)
+    (local / "changes.txt").write_text("")
+    GitUtils.run_command(["git", "add", "."], cwd=local)
+    GitUtils.run_command(["git", "commit", "-q", "-m", "init", "--date", "2024-01-01T00:00:00Z"], cwd=local)
+    GitUtils.run_command(["git", "push", "-q", "origin", "main"], cwd=local)
+    return local
+
+
+def loop_engine(local: Path, sentences: list) -> None:
+    for sentence in sentences:
+        with (local / "changes.txt").open("a") as f:
+            f.write(sentence + "\n")
+        GitUtils.add_commit_push(local_path=local, commit_message=sentence, branch_name="main")
+
+
+def fast_import_engine(local: Path, sentences: list) -> None:
+    def contents():
+        content = (local / "changes.txt").read_text()
+        for sentence in sentences:
+            content += sentence + "\n"
+            yield sentence, content, None
+    GitUtils.fast_import_commits(
+        local_path=local,
+        branch_name="main",
+        file_name="changes.txt",
+        commits=contents(),
+        author_email="bench@example.com"
+    )
+    GitUtils.push_branch(local_path=local, branch_name="main")
+
+
+def history(local: Path) -> str:
+    return GitUtils.run_command(["git", "log", "--format=%T %an <%ae> %B"], cwd=local)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=100, help="number of commits created by each engine")
+    args = parser.parse_args()
+    logger.remove()
+
+    sentences = [f":rocket: feat: benchmark sentence number {i}." for i in range(args.commits)]
+    with tempfile.TemporaryDirectory() as root:
+        results = {}
+        for name, engine in (("add_commit_push loop", loop_engine), ("git fast-import", fast_import_engine)):
+            local = prepare_repository(Path(root), name.split()[-1])
+            start = time.perf_counter()
+            engine(local, sentences)
+            results[name] = (time.perf_counter() - start, history(local))
+
+        baseline = results["add_commit_push loop"][0]
+        for name, (duration, _) in results.items():
+            print(f"{name:<22} {args.commits:>6} commits  {duration:8.3f}s  {args.commits / duration:10.1f} commits/s  x{baseline / duration:.1f}")
+        identical = results["add_commit_push loop"][1] == results["git fast-import"][1]
+        print(f"Identical trees, authors and messages: {identical}")
+        sys.exit(0 if identical else 1)
@@ -0,0 +1,137 @@
+"""
+Measure the time the commit loop spends logging, for each logging configuration.
+
+The workflow runs offline like `bench_workflow.py`, against a local bare `origin` and the fake
+GitHub API, with its logs written to a file. The log sink can be slowed down to model an output
+that blocks its writers, e.g. a saturated log pipe. Each call of the workflow threads to the
+public logging methods, e.g. `logger.info`, is timed end to end, the background writer of an
+enqueued sink excluded. The baseline is the handler the entry point used before `LoggingConfig`,
+the default sink of loguru.
+
+The default sink latency models a write to a pipe whose reader lags behind, e.g. the log
+collector of the container; set it to 0 to measure a local file only.
+
+Usage: python benchmarks/bench_logging.py --commits 20 --sink-latency 0.001
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_github import FakeGitHub
+from bench_workflow import prepare_origin, OWNER, NAME
+from utils.generate_changes import GenerateChanges
+from utils.logging_config import LoggingConfig
+
+# None is the default sink of loguru, the other configurations are the options of LoggingConfig
+CONFIGURATIONS = {
+    "loguru default (before)": None,
+    "text": {},
+    "json": {"format": "json"},
+    "json, enqueued": {"format": "json", "enqueue": True},
+    "json, enqueued, 10% sampled": {"format": "json", "enqueue": True, "sample_rate": 0.1, "max_length": 200}
+}
+
+
+class SlowFile:
+    """
+    Log sink writing to a file, each write delayed to model a slow output.
+    """
+
+    def __init__(self, path: Path, latency: float) -> None:
+        self.file = open(path, "a")
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, message: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self.file.write(message)
+        self.file.flush()
+        self.lines += 1
+
+
+def measure_logging() -> dict:
+    """
+    Wrap the logging methods of the logger shared by the modules so that the time spent in
+    their calls is added up.
+    """
+    spent = {"time": 0.0, "calls": 0}
+
+    def timed(method: str):
+        def call(message, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                # One more frame up to the caller, so that the records keep the module of the caller
+                return getattr(logger.opt(depth=1), method)(message, *args, **kwargs)
+            finally:
+                spent["time"] += time.perf_counter() - start
+                spent["calls"] += 1
+        return call
+
+    for method in ("trace", "debug", "info", "success", "warning", "error", "critical", "exception"):
+        setattr(logger, method, timed(method))
+    return spent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=20, help="number of commits of each run")
+    parser.add_argument("--sink-latency", type=float, default=0.001, help="delay of each write to the log sink, in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each configuration, the median is reported")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random generators")
+    args = parser.parse_args()
+    spent = measure_logging()
+
+    print(f"{'configuration':<30} {'workflow':>9} {'logging':>9} {'per commit':>11} {'calls':>6} {'lines':>6} {'vs before':>10}")
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        baseline = None
+        for name, options in CONFIGURATIONS.items():
+            results = []
+            for run in range(args.repeat):
+                folder = root / f"{name}-{run}".replace(" ", "").replace(",", "-").replace("%", "")
+                folder.mkdir()
+                origin = prepare_origin(folder)
+                sink = SlowFile(folder / "log", args.sink_latency)
+                if options is None:
+                    logger.remove()
+                    logger.add(sink)
+                else:
+                    LoggingConfig(**options).apply(sink)
+                with FakeGitHub({NAME: origin}) as fake:
+                    random.seed(args.seed)
+                    changes = GenerateChanges(
+                        data_folder_name=str(folder / "work"),
+                        data_file_name="changes",
+                        repository_url=origin.as_uri(),
+                        user_email="super-dev@example.com",
+                        github_access_token="token",
+                        repository_owner=OWNER,
+                        repository_name=NAME,
+                        source_branch="feat/super-dev",
+                        target_branch="develop",
+                        prod_branch="main",
+                        github_api_url=fake.url,
+                        sentence_seed=args.seed
+                    )
+                    changes.number_of_commits = args.commits
+                    spent.update(time=0.0, calls=0)
+                    start = time.perf_counter()
+                    changes.work_hard_workflow()
+                    duration = time.perf_counter() - start
+                    logging_time, calls = spent["time"], spent["calls"]
+                # The background writer is drained before the lines are counted
+                logger.remove()
+                results.append((duration, logging_time, calls, sink.lines))
+            duration, logging_time, calls, lines = sorted(results)[len(results) // 2]
+            baseline = baseline or logging_time
+            print(
+                f"{name:<30} {duration:>8.3f}s {logging_time:>8.3f}s {logging_time / args.commits * 1000:>9.2f}ms "
+                f"{calls:>6} {lines:>6} {(logging_time - baseline) / baseline:>+10.0%}"
+            )
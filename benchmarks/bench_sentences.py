@@ -0,0 +1,62 @@
+"""
+Compare the built-in sentence generator with Faker.
+
+Startup (import and construction, measured in a fresh interpreter), the generation of the
+up to 20 sentences of a daily run, and bulk generation are reported for both.
+
+Usage: python benchmarks/bench_sentences.py --sentences 100000
+"""
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+SETUPS = {
+    "builtin": "from utils.sentences import SentenceGenerator; generator = SentenceGenerator(seed=1); sentence = generator.sentence",
+    "faker": "from faker import Faker; generator = Faker(); generator.seed_instance(1); sentence = generator.sentence",
+}
+
+
+def startup(setup: str, repeat: int) -> float:
+    """
+    Measure the best time to import and construct a generator then produce a daily run of sentences, in a fresh interpreter.
+    """
+    code = f"import time; start = time.perf_counter(); {setup}; [sentence(nb_words=6) for _ in range(20)]; print(time.perf_counter() - start)"
+    durations = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True).stdout
+        durations.append(float(output))
+    return min(durations)
+
+
+def bulk(name: str, setup: str, number_of_sentences: int) -> float:
+    """
+    Measure the time to generate many sentences with an already constructed generator,
+    in one batch for the built-in generator and one call per sentence for Faker.
+    """
+    scope = {}
+    exec(setup, scope)
+    start = time.perf_counter()
+    if name == "builtin":
+        scope["generator"].sentences(number_of_sentences, nb_words=6)
+    else:
+        for _ in range(number_of_sentences):
+            scope["sentence"](nb_words=6)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=100000, help="number of sentences of the bulk generation")
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters used to measure startup")
+    args = parser.parse_args()
+
+    results = {name: (startup(setup, args.repeat), bulk(name, setup, args.sentences)) for name, setup in SETUPS.items()}
+    print(f"{'generator':<10} {'startup + 20 sentences':>24} {f'{args.sentences} sentences':>20} {'sentences/s':>14}")
+    for name, (startup_time, bulk_time) in results.items():
+        print(f"{name:<10} {startup_time * 1000:>22.1f}ms {bulk_time:>19.3f}s {args.sentences / bulk_time:>14.0f}")
+    print(f"Speedup: x{results['faker'][0] / results['builtin'][0]:.0f} at startup, x{results['faker'][1] / results['builtin'][1]:.0f} in bulk")
@@ -0,0 +1,257 @@
+"""
+Run the whole workflow offline and report where its time goes.
+
+A local bare repository is used as `origin` and `fake_github.py` answers the GitHub API calls,
+so nothing leaves the machine. The workflow runs for each number of commits and API latency,
+with a fixed random seed making the sentences and the developer mood reproducible. The wall
+time and the number of processes spawned are reported for each phase, and the results can be
+saved then compared with a previous run, e.g. on another commit.
+
+Usage: python benchmarks/bench_workflow.py --commits 5 20 --latency 0 0.05 --json after.json --compare before.json
+       python benchmarks/bench_workflow.py --option commit_mode=fast-import --option clone_strategy=sparse --workflow async
+       python benchmarks/bench_workflow.py --files 50000 --option staging=targeted --option index_caches=True
+"""
+import os
+import ast
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextvars
+from pathlib import Path
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_github import FakeGitHub
+from utils.generate_changes import GenerateChanges
+
+# Phase reported for each private method of GenerateChanges
+PHASES = {
+    "__clone_and_configure": "clone",
+    "__setup_branches": "branches",
+    "__cleanup_file": "cleanup",
+    "__generate_and_commit": "commits",
+    "__commit_remotely": "remote commits",
+    "__create_and_merge_pr": "pull requests",
+    "__create_and_merge_pr_async": "pull requests",
+    "__promote_directly": "pull requests",
+    "__delete_source_branch": "delete branch",
+}
+OWNER = "super-dev"
+NAME = "bench"
+current_phase = contextvars.ContextVar("current_phase", default=None)
+
+
+class Recorder:
+    """
+    Wall time and processes spawned by phase during one run of the workflow.
+    """
+
+    def __init__(self) -> None:
+        self.durations = {}
+        self.spawns = {}
+
+    def spawned(self) -> None:
+        # Processes started by the fake GitHub server threads run outside any phase
+        phase = current_phase.get()
+        if phase is not None:
+            self.spawns[phase] = self.spawns.get(phase, 0) + 1
+
+    def timed(self, phase: str, method):
+        """
+        Wrap a method to record its wall time and the processes it spawns under a phase.
+        """
+        recorder = self
+
+        def finish(token, start: float) -> None:
+            recorder.durations[phase] = recorder.durations.get(phase, 0.0) + time.perf_counter() - start
+            current_phase.reset(token)
+
+        if asyncio.iscoroutinefunction(method):
+            async def wrapper(*args, **kwargs):
+                token, start = current_phase.set(phase), time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    finish(token, start)
+        else:
+            def wrapper(*args, **kwargs):
+                token, start = current_phase.set(phase), time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    finish(token, start)
+        return wrapper
+
+
+def instrument(recorder: Recorder) -> callable:
+    """
+    Install the phase timers and the process counter, and return the function removing them.
+    """
+    originals = {method: getattr(GenerateChanges, f"_GenerateChanges{method}") for method in PHASES}
+    for method, phase in PHASES.items():
+        setattr(GenerateChanges, f"_GenerateChanges{method}", recorder.timed(phase, originals[method]))
+
+    popen = subprocess.Popen
+
+    class CountingPopen(popen):
+        def __init__(self, *args, **kwargs):
+            recorder.spawned()
+            super().__init__(*args, **kwargs)
+
+    subprocess.Popen = CountingPopen
+
+    def restore() -> None:
+        subprocess.Popen = popen
+        for method in PHASES:
+            setattr(GenerateChanges, f"_GenerateChanges{method}", originals[method])
+    return restore
+
+
+def prepare_origin(root: Path, files: int = 0) -> Path:
+    """
+    Create a bare `origin` repository with a data file on `main` and `develop`,
+    and as many other files as asked for to simulate a large working tree.
+    """
+    origin = root / "origin.git"
+    seed = root / "seed"
+    git = lambda *args, cwd=None: subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=True)
+    git("init", "-q", "--bare", "-b", "main", str(origin))
+    # Blobless and sparse clones need filters to be allowed
+    git("config", "uploadpack.allowFilter", "true", cwd=origin)
+    git("clone", "-q", str(origin), str(seed))
+    (seed / "changes.txt").write_text("")
+    for index in range(files):
+        # 100 files per folder, like a source tree
+        folder = seed / "src" / f"module{index // 100}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"file{index % 100}.txt").write_text(f"{index}\n")
+    git("add", ".", cwd=seed)
+    git("-c", "user.name=seed", "-c", "user.email=seed@example.com", "commit", "-q", "-m", "init", cwd=seed)
+    git("push", "-q", "origin", "main", "main:develop", cwd=seed)
+    return origin
+
+
+def run_once(commits: int, latency: float, args: argparse.Namespace, options: dict) -> dict:
+    """
+    Run the workflow once against a new origin and fake GitHub API.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+        origin = prepare_origin(root, args.files)
+        trace = root / "trace2.json"
+        recorder = Recorder()
+        with FakeGitHub({NAME: origin}, latency=latency, mergeable_after=args.mergeable_after, protected_branches=tuple(args.protected)) as fake:
+            random.seed(args.seed)
+            changes = GenerateChanges(
+                data_folder_name=str(root / "work"),
+                data_file_name="changes",
+                repository_url=origin.as_uri(),
+                user_email="super-dev@example.com",
+                github_access_token="token",
+                repository_owner=OWNER,
+                repository_name=NAME,
+                source_branch="feat/super-dev",
+                target_branch="develop",
+                prod_branch="main",
+                github_api_url=fake.url,
+                sentence_seed=args.seed,
+                **options
+            )
+            changes.number_of_commits = commits
+            restore = instrument(recorder)
+            os.environ["GIT_TRACE2_EVENT"] = str(trace)
+            start = time.perf_counter()
+            try:
+                if args.workflow == "async":
+                    asyncio.run(changes.work_hard_workflow_async())
+                else:
+                    changes.work_hard_workflow()
+            finally:
+                total = time.perf_counter() - start
+                del os.environ["GIT_TRACE2_EVENT"]
+                restore()
+            api_calls = len(fake.calls)
+        if not recorder.durations:
+            sys.exit(f"The developer rests with seed {args.seed}, pick another --seed.")
+        git_processes = sum('"event":"start"' in line for line in trace.read_text().splitlines()) if trace.exists() else 0
+        return {
+            "total": total,
+            "phases": recorder.durations,
+            "spawns": recorder.spawns,
+            "git_processes": git_processes,
+            "api_calls": api_calls,
+        }
+
+
+def summarize(runs: list) -> dict:
+    """
+    Reduce the runs of one configuration to the median of each measure.
+    """
+    phases = [phase for phase in dict.fromkeys(PHASES.values()) if any(phase in run["phases"] for run in runs)]
+    return {
+        "total": statistics.median(run["total"] for run in runs),
+        "phases": {phase: statistics.median(run["phases"].get(phase, 0.0) for run in runs) for phase in phases},
+        "spawns": {phase: max(run["spawns"].get(phase, 0) for run in runs) for phase in phases},
+        "git_processes": max(run["git_processes"] for run in runs),
+        "api_calls": max(run["api_calls"] for run in runs),
+    }
+
+
+def parse_option(option: str) -> tuple:
+    key, _, value = option.partition("=")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, nargs="+", default=[5, 20], help="numbers of commits of the runs")
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0, 0.05], help="latencies of the fake GitHub API, in seconds")
+    parser.add_argument("--mergeable-after", type=float, default=0.0, help="time a pull request takes to become mergeable, in seconds")
+    parser.add_argument("--protected", nargs="*", default=[], help="branches only updated through pull requests")
+    parser.add_argument("--files", type=int, default=0, help="number of other files in the repository")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each configuration, the median is reported")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random generators")
+    parser.add_argument("--workflow", choices=("sync", "async"), default="sync", help="workflow to run")
+    parser.add_argument("--option", action="append", default=[], help="GenerateChanges argument e.g. commit_mode=batch, repeatable")
+    parser.add_argument("--json", help="path of a JSON file the results are written to")
+    parser.add_argument("--compare", help="path of a JSON file of a previous run to compare with")
+    parser.add_argument("--verbose", action="store_true", help="show the workflow logs")
+    args = parser.parse_args()
+    options = dict(parse_option(option) for option in args.option)
+    logger.remove()
+    logger.add(sys.stderr, level="INFO" if args.verbose else "WARNING")
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {(result["commits"], result["latency"]): result for result in json.load(f)["results"]}
+
+    results = []
+    for commits in args.commits:
+        for latency in args.latency:
+            summary = summarize([run_once(commits, latency, args, options) for _ in range(args.repeat)])
+            results.append({"commits": commits, "latency": latency, **summary})
+            before = previous.get((commits, latency))
+            delta = lambda now, then: f" ({(now - then) / then * 100:+.0f}%)" if then else ""
+
+            print(f"{commits} commits, {latency * 1000:.0f}ms API latency: {summary['total']:.3f}s"
+                  f"{delta(summary['total'], before['total']) if before else ''}, median of {args.repeat}")
+            print(f"  {'phase':<20} {'wall':>8} {'spawns':>7}")
+            for phase, duration in summary["phases"].items():
+                change = delta(duration, before["phases"].get(phase, 0.0)) if before else ""
+                print(f"  {phase:<20} {duration:>7.3f}s {summary['spawns'][phase]:>7}{change}")
+            print(f"  git processes: {summary['git_processes']}, API calls: {summary['api_calls']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": options, "workflow": args.workflow, "seed": args.seed, "results": results}, f, indent=4)
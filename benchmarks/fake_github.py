@@ -0,0 +1,287 @@
+"""
+Local stand-in for the GitHub REST API endpoints used by the workflow, backed by bare repositories.
+
+Pull requests are kept in memory and merged with real merge commits in the bare repository,
+the Git Data API endpoints (refs, commits, trees, contents) read and write the same repository.
+Every request waits for a configurable latency and is recorded. Protected branches only change
+through pull requests: the merges endpoint refuses them and a hook rejects the pushes to them.
+"""
+import os
+import re
+import json
+import time
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeGitHub:
+    """
+    Fake GitHub API server running in a background thread.
+    """
+
+    def __init__(self, repositories: dict, latency: float = 0.0, mergeable_after: float = 0.0, protected_branches: tuple = ()) -> None:
+        """
+        Constructor of the FakeGitHub class, the server is started right away.
+
+        Attributes
+        ----------
+        repositories : dict
+            The path of the bare repository by repository name.
+        latency : float
+            The time each request waits before being answered, in seconds.
+        mergeable_after : float
+            The time a pull request takes to become mergeable after its creation, in seconds.
+        protected_branches : tuple
+            The branches requiring a pull request to be updated.
+        """
+        self.repositories = {name: Path(path) for name, path in repositories.items()}
+        self.latency = latency
+        self.mergeable_after = mergeable_after
+        self.protected_branches = protected_branches
+        for repository in self.repositories.values():
+            self.protect(repository)
+        self.pulls = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        # The commands of the server are not part of the measured workflow
+        self.env = {key: value for key, value in os.environ.items() if not key.startswith("GIT_TRACE2")}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.__handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        """
+        Stop the server.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeGitHub":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __handler(self) -> type:
+        """
+        Build the request handler class bound to this server.
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def send(self, status: int, payload=None, headers: dict = None, raw: bytes = None) -> None:
+                body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b"")
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def json(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def dispatch(self, method: str) -> None:
+                time.sleep(fake.latency)
+                with fake.lock:
+                    fake.calls.append((method, self.path, time.monotonic()))
+                try:
+                    fake.route(self, method)
+                except subprocess.CalledProcessError as e:
+                    self.send(422, {"message": e.stderr.decode().strip()})
+
+            def do_GET(self) -> None:
+                self.dispatch("GET")
+
+            def do_POST(self) -> None:
+                self.dispatch("POST")
+
+            def do_PUT(self) -> None:
+                self.dispatch("PUT")
+
+            def do_PATCH(self) -> None:
+                self.dispatch("PATCH")
+
+            def do_DELETE(self) -> None:
+                self.dispatch("DELETE")
+
+        return Handler
+
+    def git(self, repository: Path, *args: str, input: bytes = None, env: dict = None) -> str:
+        """
+        Run a git command in a bare repository and return its output.
+        """
+        process = subprocess.run(["git", *args], cwd=repository, input=input, env=env or self.env, capture_output=True, check=True)
+        return process.stdout.decode().strip()
+
+    def protect(self, repository: Path) -> None:
+        """
+        Install a hook rejecting the pushes to the protected branches of a repository.
+        """
+        hook = repository / "hooks" / "pre-receive"
+        if not self.protected_branches:
+            hook.unlink(missing_ok=True)
+            return
+        refs = " ".join(f"refs/heads/{branch}" for branch in self.protected_branches)
+        hook.write_text(
+            "#!/bin/sh\n"
+            "while read old new ref; do\n"
+            f"  for protected in {refs}; do\n"
+            '    [ "$ref" = "$protected" ] && echo "GH006: Protected branch update failed for $ref." >&2 && exit 1\n'
+            "  done\n"
+            "done\n"
+            "exit 0\n"
+        )
+        hook.chmod(0o755)
+
+    def merge(self, repository: Path, base: str, head: str, message: str) -> str:
+        """
+        Merge a commit into a branch with a merge commit and return its SHA.
+        """
+        base_sha = self.git(repository, "rev-parse", f"refs/heads/{base}")
+        head_sha = self.git(repository, "rev-parse", head)
+        tree = self.git(repository, "merge-tree", "--write-tree", base_sha, head_sha)
+        sha = self.git(repository, "-c", "user.name=GitHub", "-c", "user.email=noreply@github.com", "commit-tree", tree, "-p", base_sha, "-p", head_sha, "-m", message)
+        self.git(repository, "update-ref", f"refs/heads/{base}", sha, base_sha)
+        return sha
+
+    def has_ref(self, repository: Path, ref: str) -> bool:
+        return subprocess.run(["git", "rev-parse", "--verify", "-q", ref], cwd=repository, env=self.env, capture_output=True).returncode == 0
+
+    def route(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        """
+        Answer a request to one of the supported endpoints.
+        """
+        path = handler.path.split("?")[0]
+        match = re.match(r"/repos/[^/]+/([^/]+)/(.*)", path)
+        if not match or match[1] not in self.repositories:
+            return handler.send(404, {"message": "Not Found"})
+        name, endpoint = match[1], match[2]
+        repository = self.repositories[name]
+
+        if endpoint == "pulls" and method == "POST":
+            data = handler.json()
+            with self.lock:
+                if any(pull["repository"] == name and pull["state"] == "open" and (pull["head"], pull["base"]) == (data["head"], data["base"]) for pull in self.pulls.values()):
+                    return handler.send(422, {"message": "Validation Failed", "errors": [{"message": f"A pull request already exists for {data['head']}."}]})
+                number = len(self.pulls) + 1
+                self.pulls[number] = {"number": number, "repository": name, "state": "open", "head": data["head"], "base": data["base"], "created": time.monotonic(), "labels": []}
+            return handler.send(201, {"number": number, "html_url": f"{self.url}/{name}/pull/{number}"})
+
+        if endpoint == "pulls" and method == "GET":
+            query = parse_qs(urlsplit(handler.path).query)
+            head = query.get("head", [""])[0].split(":")[-1]
+            pulls = [
+                {"number": pull["number"], "html_url": f"{self.url}/{name}/pull/{pull['number']}"} for pull in self.pulls.values()
+                if pull["repository"] == name and pull["state"] == query.get("state", ["open"])[0]
+                and (not head or pull["head"] == head) and pull["base"] == query.get("base", [pull["base"]])[0]
+            ]
+            return handler.send(200, pulls)
+
+        if match := re.fullmatch(r"issues/(\d+)/labels", endpoint):
+            self.pulls[int(match[1])]["labels"] += handler.json()["labels"]
+            return handler.send(200, [{"name": label} for label in self.pulls[int(match[1])]["labels"]])
+
+        if match := re.fullmatch(r"pulls/(\d+)", endpoint):
+            pull = self.pulls[int(match[1])]
+            ready = time.monotonic() - pull["created"] >= self.mergeable_after
+            etag = f'"{pull["number"]}-{ready}-{pull["state"]}"'
+            if handler.headers.get("If-None-Match") == etag:
+                return handler.send(304, headers={"ETag": etag})
+            payload = {"number": pull["number"], "state": pull["state"], "mergeable": True if ready else None, "mergeable_state": "clean" if ready else "unknown", "merged": pull["state"] == "closed"}
+            return handler.send(200, payload, {"ETag": etag})
+
+        if match := re.fullmatch(r"pulls/(\d+)/merge", endpoint):
+            pull = self.pulls[int(match[1])]
+            handler.json()
+            sha = self.merge(repository, pull["base"], f"refs/heads/{pull['head']}", f"Merge pull request #{pull['number']} from {pull['head']}")
+            pull["state"] = "closed"
+            return handler.send(200, {"sha": sha, "merged": True, "message": "Pull Request successfully merged"})
+
+        if endpoint == "merges" and method == "POST":
+            data = handler.json()
+            if data["base"] in self.protected_branches:
+                return handler.send(409, {"message": "Protected branch update failed"})
+            # The head is a branch name or a commit SHA
+            head = f"refs/heads/{data['head']}" if self.has_ref(repository, f"refs/heads/{data['head']}") else data["head"]
+            if subprocess.run(["git", "merge-base", "--is-ancestor", head, f"refs/heads/{data['base']}"], cwd=repository, env=self.env).returncode == 0:
+                return handler.send(204)
+            sha = self.merge(repository, data["base"], head, data["commit_message"])
+            return handler.send(201, {"sha": sha})
+
+        if match := re.fullmatch(r"git/refs/heads/(.+)", endpoint):
+            ref = f"refs/heads/{match[1]}"
+            if method == "DELETE":
+                if not self.has_ref(repository, ref):
+                    return handler.send(422, {"message": "Reference does not exist"})
+                self.git(repository, "update-ref", "-d", ref)
+                return handler.send(204)
+            if method == "PATCH":
+                data = handler.json()
+                old = self.git(repository, "rev-parse", ref)
+                fast_forward = subprocess.run(["git", "merge-base", "--is-ancestor", old, data["sha"]], cwd=repository, env=self.env).returncode == 0
+                if not data.get("force") and not fast_forward:
+                    return handler.send(422, {"message": "Update is not a fast forward"})
+                self.git(repository, "update-ref", ref, data["sha"])
+                return handler.send(200, {"ref": ref, "object": {"sha": data["sha"]}})
+
+        if endpoint == "git/refs" and method == "POST":
+            data = handler.json()
+            if self.has_ref(repository, data["ref"]):
+                return handler.send(422, {"message": "Reference already exists"})
+            self.git(repository, "update-ref", data["ref"], data["sha"], "")
+            return handler.send(201, {"ref": data["ref"], "object": {"sha": data["sha"]}})
+
+        if match := re.fullmatch(r"git/ref/heads/(.+)", endpoint):
+            ref = f"refs/heads/{match[1]}"
+            if not self.has_ref(repository, ref):
+                return handler.send(404, {"message": "Not Found"})
+            return handler.send(200, {"ref": ref, "object": {"sha": self.git(repository, "rev-parse", ref)}})
+
+        if match := re.fullmatch(r"git/commits/([0-9a-f]+)", endpoint):
+            return handler.send(200, {"sha": match[1], "tree": {"sha": self.git(repository, "rev-parse", f"{match[1]}^{{tree}}")}})
+
+        if endpoint == "git/commits" and method == "POST":
+            data = handler.json()
+            env = dict(
+                self.env,
+                GIT_AUTHOR_NAME=data["author"]["name"], GIT_AUTHOR_EMAIL=data["author"]["email"],
+                GIT_COMMITTER_NAME=data["committer"]["name"], GIT_COMMITTER_EMAIL=data["committer"]["email"]
+            )
+            if "date" in data["author"]:
+                env.update(GIT_AUTHOR_DATE=data["author"]["date"], GIT_COMMITTER_DATE=data["committer"]["date"])
+            parents = [argument for parent in data["parents"] for argument in ("-p", parent)]
+            sha = self.git(repository, "commit-tree", data["tree"], *parents, "-F", "-", input=data["message"].encode(), env=env)
+            return handler.send(201, {"sha": sha})
+
+        if endpoint == "git/trees" and method == "POST":
+            data = handler.json()
+            with tempfile.TemporaryDirectory() as folder:
+                env = dict(self.env, GIT_INDEX_FILE=f"{folder}/index")
+                self.git(repository, "read-tree", data["base_tree"], env=env)
+                for entry in data["tree"]:
+                    if "sha" in entry and entry["sha"] is None:
+                        self.git(repository, "update-index", "--force-remove", entry["path"], env=env)
+                        continue
+                    blob = self.git(repository, "hash-object", "-w", "--stdin", input=entry["content"].encode(), env=env)
+                    self.git(repository, "update-index", "--add", "--cacheinfo", f"{entry['mode']},{blob},{entry['path']}", env=env)
+                return handler.send(201, {"sha": self.git(repository, "write-tree", env=env)})
+
+        if match := re.fullmatch(r"contents/(.+)", endpoint):
+            ref = parse_qs(urlsplit(handler.path).query).get("ref", ["HEAD"])[0]
+            process = subprocess.run(["git", "show", f"{ref}:{match[1]}"], cwd=repository, env=self.env, capture_output=True)
+            if process.returncode:
+                return handler.send(404, {"message": "Not Found"})
+            return handler.send(200, raw=process.stdout)
+
+        return handler.send(404, {"message": "Not Found"})
@@ -0,0 +1,123 @@
+"""
+Report where the startup time of `src/main.py` goes, up to its first git command.
+
+The entry point is run in a fresh interpreter with `-X importtime` and a `git` shim first on
+the PATH: the shim records when it is called then fails, which stops the run right there.
+The report gives the time to the first git command, the time spent importing modules and the
+slowest imports. The developer mood is random, runs without any git command are retried.
+
+Usage: python benchmarks/startup_report.py --top 15
+       python benchmarks/startup_report.py --python "uv run python"
+"""
+import os
+import sys
+import time
+import shlex
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SHIM = '#!/bin/sh\ndate +%s.%N >> "$STARTUP_REPORT_MARKER"\nexit 1\n'
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse the `-X importtime` lines of a run.
+
+    Parameters
+    ----------
+    stderr : str
+        The standard error of the run.
+
+    Returns
+    -------
+    list
+        The self time in microseconds, cumulative time in microseconds, depth and name of each import.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(self_time), int(cumulative), depth, name.strip()))
+    return imports
+
+
+def run(python: list, folder: Path) -> tuple:
+    """
+    Run the entry point until its first git command.
+
+    Parameters
+    ----------
+    python : list
+        The command starting the interpreter e.g. ["python"].
+    folder : Path
+        A temporary folder for the git shim and the data folder.
+
+    Returns
+    -------
+    tuple
+        The time to the first git command in seconds or None if there was none, and the imports.
+    """
+    marker = folder / "marker"
+    marker.unlink(missing_ok=True)
+    env = dict(
+        os.environ,
+        PATH=f"{folder / 'bin'}{os.pathsep}{os.environ['PATH']}",
+        STARTUP_REPORT_MARKER=str(marker),
+        DATA_FOLDER_NAME=str(folder / "data"),
+        DATA_FILE_NAME="changes",
+        REPOSITORY_URL="https://github.com/owner/repository.git",
+        USER_EMAIL="super-dev@example.com",
+        GITHUB_ACCESS_TOKEN="token",
+        REPOSITORY_OWNER="owner",
+        REPOSITORY_NAME="repository",
+        SOURCE_BRANCH="feat/super-dev",
+        TARGET_BRANCH="develop",
+        PROD_BRANCH="main",
+    )
+    start = time.time()
+    process = subprocess.run([*python, "-X", "importtime", "src/main.py"], cwd=ROOT, env=env, capture_output=True, text=True)
+    first_git = float(marker.read_text().split()[0]) - start if marker.exists() else None
+    return first_git, parse_importtime(process.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--python", default=shlex.quote(sys.executable), help="command starting the interpreter, e.g. \"uv run python\"")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports listed")
+    parser.add_argument("--attempts", type=int, default=10, help="number of runs tried to get past the developer mood")
+    args = parser.parse_args()
+    python = shlex.split(args.python)
+
+    with tempfile.TemporaryDirectory() as folder:
+        folder = Path(folder)
+        (folder / "bin").mkdir()
+        (folder / "bin" / "git").write_text(SHIM)
+        (folder / "bin" / "git").chmod(0o755)
+
+        start = time.time()
+        subprocess.run([*python, "-c", "pass"], cwd=ROOT, check=True)
+        interpreter = time.time() - start
+        for _ in range(args.attempts):
+            first_git, imports = run(python, folder)
+            if first_git is not None:
+                break
+        else:
+            sys.exit(f"No git command was run in {args.attempts} attempts.")
+
+    top_level = [item for item in imports if item[2] == 0]
+    print(f"Interpreter startup:           {interpreter * 1000:8.1f}ms")
+    print(f"Time to the first git command: {first_git * 1000:8.1f}ms")
+    print(f"Imports:                       {sum(item[1] for item in top_level) / 1000:8.1f}ms, {len(imports)} modules")
+    print()
+    print(f"{'cumulative':>12} {'self':>10}  top-level import")
+    for self_time, cumulative, _, name in sorted(top_level, reverse=True, key=lambda item: item[1])[:args.top]:
+        print(f"{cumulative / 1000:>10.1f}ms {self_time / 1000:>8.1f}ms  {name}")
+    print()
+    print(f"{'self':>12}  module")
+    for self_time, _, _, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"{self_time / 1000:>10.1f}ms  {name}")
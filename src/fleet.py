@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import argparse
+from loguru import logger
+from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from utils.generate_changes import GenerateChanges
+from utils.tracing import tracer
+from utils.rate_limiter import RateLimiter
+from utils.resource_report import ResourceReport
+from utils.logging_config import LoggingConfig
+
+
+def load_targets(manifest_path: str) -> list:
+    """
+    Load the workflow arguments of each repository from a manifest.
+    The manifest is a JSON object with optional "defaults" shared by every target and a list of "targets",
+    both using the arguments of GenerateChanges. A target can read its token from an environment variable
+    with "github_access_token_env" to keep secrets out of the manifest.
+
+    Parameters
+    ----------
+    manifest_path : str
+        The path of the JSON manifest.
+
+    Returns
+    -------
+    list
+        The GenerateChanges arguments of each target.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    targets = []
+    for target in manifest["targets"]:
+        arguments = {**manifest.get("defaults", {}), **target}
+        token_variable = arguments.pop("github_access_token_env", None)
+        if token_variable:
+            arguments["github_access_token"] = os.getenv(token_variable)
+        # Each repository gets its own working directory
+        repository = f"{arguments['repository_owner']}/{arguments['repository_name']}"
+        arguments["data_folder_name"] = f"{arguments.get('data_folder_name', 'data')}/{repository}"
+        targets.append(arguments)
+
+    repositories = [f"{target['repository_owner']}/{target['repository_name']}" for target in targets]
+    duplicates = {repository for repository in repositories if repositories.count(repository) > 1}
+    if duplicates:
+        raise ValueError(f"Repositories listed more than once in the manifest: {', '.join(sorted(duplicates))}.")
+    return targets
+
+
+def run_target(arguments: dict) -> dict:
+    """
+    Run the workflow for one repository.
+
+    Parameters
+    ----------
+    arguments : dict
+        The GenerateChanges arguments of the repository.
+
+    Returns
+    -------
+    dict
+        The repository, the status of the workflow, its duration and the error if it failed.
+    """
+    repository = f"{arguments['repository_owner']}/{arguments['repository_name']}"
+    start = time.perf_counter()
+    # The logs of the workflows running at the same time are told apart by their repository, a rest day included
+    with logger.contextualize(repository=repository):
+        try:
+            GenerateChanges(**arguments).work_hard_workflow()
+            return {"repository": repository, "status": "success", "duration": time.perf_counter() - start, "error": None}
+        except Exception as e:
+            logger.error(f"Workflow failed for {repository}: {e}")
+            return {"repository": repository, "status": "failure", "duration": time.perf_counter() - start, "error": str(e)}
+
+
+def run_fleet(targets: list, workers: int) -> list:
+    """
+    Run the workflow of many repositories concurrently with a bounded pool of workers.
+
+    Parameters
+    ----------
+    targets : list
+        The GenerateChanges arguments of each repository.
+    workers : int
+        The number of workflows running at the same time.
+
+    Returns
+    -------
+    list
+        The result of each repository, in the order of the targets.
+    """
+    logger.info(f"Running the workflow for {len(targets)} repositories with {workers} workers...")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fleet") as executor:
+        return list(executor.map(run_target, targets))
+
+
+if __name__ == "__main__":
+
+    # Load environment variables
+    load_dotenv()
+    try:
+        LoggingConfig.from_env().apply()
+    except ValueError as e:
+        # The default sink of loguru is still in place to report it
+        logger.error(f"Invalid logging configuration: {e}")
+        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Run the Super Dev workflow for many repositories at once.")
+    parser.add_argument("manifest", help="path of the JSON manifest listing the repositories")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("FLEET_WORKERS", "4")), help="number of concurrent workflows")
+    args = parser.parse_args()
+    trace_export = os.getenv("TRACE_EXPORT")
+    trace_format = os.getenv("TRACE_FORMAT", "jsonl")
+    resource_report = os.getenv("RESOURCE_REPORT")
+    report = ResourceReport.from_env()
+    if trace_format not in tracer.FORMATS:
+        logger.error(f"Unsupported trace format '{trace_format}', expected one of {tracer.FORMATS}.")
+        sys.exit(1)
+
+    try:
+        results = run_fleet(load_targets(args.manifest), args.workers)
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        sys.exit(1)
+
+    # Each repository has its own trace, the summary shows the stragglers across the fleet
+    spans = tracer.pop_spans()
+    # The CPU and memory are the ones of the process, shared by the workflows running at the same time,
+    # so the report covers the whole fleet, each repository being a run of its phases
+    resources = report.build(spans)
+    logger.info(f"Resources: {report.summary(resources)}")
+    if resource_report:
+        report.write(resources, resource_report)
+    if spans:
+        logger.info(f"Trace summary:\n{tracer.summary(spans)}")
+        if trace_export:
+            tracer.export(spans, trace_export, trace_format)
+    rate_limits = RateLimiter.metrics()
+    wait_time = ", ".join(f"{reason} {seconds:.1f}s" for reason, seconds in rate_limits["wait_time"].items()) or "none"
+    logger.info(f"GitHub API rate limits delayed {rate_limits['waits']} of {rate_limits['requests']} requests, waiting time: {wait_time}.")
+
+    for result in results:
+        message = f"{result['repository']:<50} {result['status']:<8} {result['duration']:7.1f}s"
+        if result["error"]:
+            message += f" {result['error']}"
+        logger.info(message)
+    failures = [result for result in results if result["status"] == "failure"]
+    if failures:
+        logger.error(f"{len(failures)} of {len(results)} workflows failed.")
+        sys.exit(1)
+    logger.success(f"{len(results)} workflows completed successfully.")
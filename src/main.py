@@ -1,14 +1,26 @@
 import os
 import sys
+import asyncio
+from datetime import date
 from loguru import logger
 from dotenv import load_dotenv
 from utils.generate_changes import GenerateChanges
+from utils.tracing import tracer
+from utils.rate_limiter import RateLimiter
+from utils.resource_report import ResourceReport
+from utils.logging_config import LoggingConfig
 
 
 if __name__ == "__main__":
         
     # Load environment variables
     load_dotenv()
+    try:
+        LoggingConfig.from_env().apply()
+    except ValueError as e:
+        # The default sink of loguru is still in place to report it
+        logger.error(f"Invalid logging configuration: {e}")
+        sys.exit(1)
     data_folder_name=os.getenv("DATA_FOLDER_NAME")
     data_file_name=os.getenv("DATA_FILE_NAME")
     repository_url=os.getenv("REPOSITORY_URL")
@@ -19,23 +31,146 @@ if __name__ == "__main__":
     prod_branch=os.getenv("PROD_BRANCH")
     repository_owner=os.getenv("REPOSITORY_OWNER")
     repository_name=os.getenv("REPOSITORY_NAME")
+    commit_mode=os.getenv("COMMIT_MODE", "each")
+    clone_strategy=os.getenv("CLONE_STRATEGY", "full")
+    clone_depth=int(os.getenv("CLONE_DEPTH", "1"))
+    github_api_url=os.getenv("GITHUB_API_URL", "https://api.github.com")
+    github_timeout=float(os.getenv("GITHUB_TIMEOUT", "10"))
+    github_max_retries=int(os.getenv("GITHUB_MAX_RETRIES", "4"))
+    github_mutations_per_minute=int(os.getenv("GITHUB_MUTATIONS_PER_MINUTE", "80"))
+    merge_timeout=float(os.getenv("MERGE_TIMEOUT", "60"))
+    backend=os.getenv("BACKEND", "git")
+    segment_max_lines=int(os.getenv("DATA_SEGMENT_MAX_LINES", "0")) or None
+    segment_max_bytes=int(os.getenv("DATA_SEGMENT_MAX_BYTES", "0")) or None
+    keep_segments=int(os.getenv("DATA_KEEP_SEGMENTS", "0"))
+    keep_lines=int(os.getenv("DATA_KEEP_LINES", "0"))
+    sentence_generator=os.getenv("SENTENCE_GENERATOR", "builtin")
+    sentence_seed=int(os.getenv("SENTENCE_SEED")) if os.getenv("SENTENCE_SEED") else None
+    object_cache=os.getenv("GIT_OBJECT_CACHE")
+    repository_cache=os.getenv("REPO_CACHE")
+    repository_cache_format=os.getenv("REPO_CACHE_FORMAT", "bundle")
+    staging=os.getenv("STAGING_MODE", "all")
+    index_caches=os.getenv("GIT_INDEX_CACHES", "false").lower() == "true"
+    promotion=os.getenv("PROMOTION_STRATEGY", "pull-request")
+    run_journal=os.getenv("RUN_JOURNAL")
+    git_library=os.getenv("GIT_LIBRARY", "subprocess")
+    async_workflow=os.getenv("ASYNC_WORKFLOW", "false").lower() == "true"
+    backfill_from=date.fromisoformat(os.getenv("BACKFILL_FROM")) if os.getenv("BACKFILL_FROM") else None
+    backfill_to=date.fromisoformat(os.getenv("BACKFILL_TO")) if os.getenv("BACKFILL_TO") else date.today()
+    trace_export=os.getenv("TRACE_EXPORT")
+    trace_format=os.getenv("TRACE_FORMAT", "jsonl")
+    resource_report=os.getenv("RESOURCE_REPORT")
+    service_mode=os.getenv("SERVICE_MODE", "false").lower() == "true"
+    if trace_format not in tracer.FORMATS:
+        logger.error(f"Unsupported trace format '{trace_format}', expected one of {tracer.FORMATS}.")
+        sys.exit(1)
     
-    try:
-        # Start the workflow
-        changes = GenerateChanges(
-            data_folder_name=data_folder_name,
-            data_file_name=data_file_name,
-            repository_url=repository_url,
-            user_email=user_email,
-            github_access_token=github_access_token,
-            repository_owner=repository_owner,
-            repository_name=repository_name,
-            source_branch=source_branch,
-            target_branch=target_branch,
-            prod_branch=prod_branch
+    settings = dict(
+        data_folder_name=data_folder_name,
+        data_file_name=data_file_name,
+        repository_url=repository_url,
+        user_email=user_email,
+        github_access_token=github_access_token,
+        repository_owner=repository_owner,
+        repository_name=repository_name,
+        source_branch=source_branch,
+        target_branch=target_branch,
+        prod_branch=prod_branch,
+        commit_mode=commit_mode,
+        clone_strategy=clone_strategy,
+        clone_depth=clone_depth,
+        github_api_url=github_api_url,
+        github_timeout=github_timeout,
+        github_max_retries=github_max_retries,
+        github_mutations_per_minute=github_mutations_per_minute,
+        merge_timeout=merge_timeout,
+        backend=backend,
+        segment_max_lines=segment_max_lines,
+        segment_max_bytes=segment_max_bytes,
+        keep_segments=keep_segments,
+        keep_lines=keep_lines,
+        sentence_generator=sentence_generator,
+        sentence_seed=sentence_seed,
+        object_cache=object_cache,
+        repository_cache=repository_cache,
+        repository_cache_format=repository_cache_format,
+        staging=staging,
+        index_caches=index_caches,
+        promotion=promotion,
+        run_journal=run_journal,
+        git_library=git_library
+    )
+
+    def run_workflow(options: dict, report: ResourceReport) -> int:
+        """
+        Run a workflow, then report its spans and resources even when it failed, it is when they are the most useful.
+
+        Parameters
+        ----------
+        options : dict
+            The workflow: {"workflow": "daily"} by default, "async", or "backfill" with the
+            "backfill_from" and "backfill_to" dates.
+        report : ResourceReport
+            The resources report of the run.
+
+        Returns
+        -------
+        int
+            The number of commits.
+        """
+        try:
+            changes = GenerateChanges(**settings)
+            workflow = options.get("workflow", "daily")
+            if workflow == "backfill":
+                changes.backfill_workflow(date.fromisoformat(options["backfill_from"]), date.fromisoformat(options.get("backfill_to") or date.today().isoformat()))
+            elif workflow == "async":
+                asyncio.run(changes.work_hard_workflow_async())
+            elif workflow == "daily":
+                changes.work_hard_workflow()
+            else:
+                raise ValueError(f"Unsupported workflow '{workflow}', expected one of ('daily', 'async', 'backfill').")
+            return changes.number_of_commits
+        finally:
+            spans = tracer.pop_spans()
+            resources = report.build(spans)
+            logger.info(f"Resources: {report.summary(resources)}")
+            if resource_report:
+                report.write(resources, resource_report)
+            if spans:
+                logger.info(f"Trace summary:\n{tracer.summary(spans)}")
+                if trace_export:
+                    tracer.export(spans, trace_export, trace_format)
+            rate_limits = RateLimiter.metrics()
+            if rate_limits["waits"]:
+                logger.info(f"Waited {sum(rate_limits['wait_time'].values()):.1f}s on GitHub API rate limits for {rate_limits['waits']} of {rate_limits['requests']} requests.")
+
+    if service_mode:
+        # The HTTP server modules are only loaded by the service, not by the batch runs
+        from utils.workflow_service import WorkflowService
+        # The process, its connections and the clone are kept warm between the runs
+        service = WorkflowService(
+            run=lambda repository, options: run_workflow(options, ResourceReport.from_env(
+                minimum_billed=0.0, 
+                from_process_start=False
+            )),
+            repositories=[f"{repository_owner}/{repository_name}"],
+            host=os.getenv("SERVICE_HOST", "127.0.0.1"),
+            port=int(os.getenv("PORT", "8080")),
+            max_queued=int(os.getenv("SERVICE_MAX_QUEUED", "10")),
+            refresh=lambda repository: GenerateChanges(**settings).refresh_clone(),
+            refresh_interval=float(os.getenv("SERVICE_REFRESH_INTERVAL", "0")),
+            token=os.getenv("SERVICE_TOKEN")
         )
-        changes.work_hard_workflow()
-    except Exception as e:
-        logger.error(f"An error occurred: {e}")
-        sys.exit(1)
-    
\ No newline at end of file
+        service.serve_forever()
+    else:
+        if backfill_from:
+            options = {"workflow": "backfill", "backfill_from": backfill_from.isoformat(), "backfill_to": backfill_to.isoformat()}
+        else:
+            options = {"workflow": "async" if async_workflow else "daily"}
+        # Each run of the service reports its own resources, a batch run reports the whole process
+        report = ResourceReport.from_env()
+        try:
+            run_workflow(options, report)
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+            sys.exit(1)
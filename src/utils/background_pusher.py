@@ -0,0 +1,99 @@
+import threading
+import contextvars
+from loguru import logger
+from utils.git_backends import GitBackend, SubprocessBackend
+from utils.tracing import tracer
+
+
+class BackgroundPusher:
+    """
+    Push a branch from a background thread while new commits are created on it.
+    Each notified commit is pushed, in order, and the commits created while a push runs are
+    pushed together by the next one, so the pusher never falls more than one push behind.
+    A failed push stops the pusher and is raised to the caller by the next notification or on exit.
+    """
+
+    def __init__(self, local_path: str, branch_name: str, git: GitBackend = None) -> None:
+        """
+        Constructor of the BackgroundPusher class, the thread starts with the `with` block.
+
+        Attributes
+        ----------
+        local_path : str
+            The local path of the repository.
+        branch_name : str
+            The name of the branch pushed.
+        git : GitBackend
+            The git operations pushing the branch, with the `git` binary by default.
+        """
+        self.local_path = local_path
+        self.branch_name = branch_name
+        self.git = git or SubprocessBackend()
+        self.committed = 0
+        self.pushed = 0
+        self.pushes = 0
+        self.error = None
+        self.closed = False
+        self.cancelled = False
+        self.condition = threading.Condition()
+        # The pushes are traced under the span of the caller
+        self.thread = threading.Thread(target=contextvars.copy_context().run, args=(self.__run,), name="pusher", daemon=True)
+
+    def __enter__(self) -> "BackgroundPusher":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(cancel=exc_type is not None)
+
+    def close(self, cancel: bool = False) -> None:
+        """
+        Wait for the last push and stop the thread, then raise the error of a failed push.
+
+        Parameters
+        ----------
+        cancel : bool
+            Stop after the running push, e.g. when the caller failed, the commits not pushed
+            yet are left to the next run and no error is raised.
+        """
+        with self.condition:
+            self.cancelled = cancel
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        if self.error and not cancel:
+            raise self.error
+
+    def notify(self) -> None:
+        """
+        Signal a new commit on the branch, to be pushed.
+        """
+        with self.condition:
+            if self.error:
+                raise self.error
+            self.committed += 1
+            self.condition.notify_all()
+
+    def __run(self) -> None:
+        """
+        Push the branch each time it has commits not pushed yet, until the pusher is closed.
+        """
+        while True:
+            with self.condition:
+                while self.pushed == self.committed and not self.closed:
+                    self.condition.wait()
+                if self.cancelled or self.pushed == self.committed:
+                    return
+                committed = self.committed
+            try:
+                with tracer.span("background push", commits=committed - self.pushed):
+                    # The push sends the tip of the branch when it starts, with at least the notified commits
+                    self.git.push_branch(local_path=self.local_path, branch_name=self.branch_name)
+            except Exception as e:
+                logger.error(f"The background push of {self.branch_name} failed, stopping: {e}")
+                with self.condition:
+                    self.error = e
+                return
+            with self.condition:
+                self.pushed = committed
+                self.pushes += 1
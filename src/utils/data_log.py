@@ -0,0 +1,222 @@
+from pathlib import Path, PurePath
+
+
+class DataLog:
+    """
+    Append-only data file split in size or line bounded segments.
+    The data file itself is the active segment. When it is full it is archived next to it as
+    `<name>.1.txt`, older segments are shifted to `<name>.2.txt`, `<name>.3.txt`... and only the
+    last `keep_segments` are retained. The last `keep_lines` lines are carried over to the new
+    active segment, read from the end of the file without reading it whole.
+    """
+    BLOCK_SIZE = 8192
+
+    def __init__(
+            self,
+            file_path: PurePath,
+            max_lines: int = None,
+            max_bytes: int = None,
+            keep_segments: int = 0,
+            keep_lines: int = 0
+        ) -> None:
+        """
+        Constructor of the DataLog class.
+
+        Attributes
+        ----------
+        file_path : PurePath
+            The path of the data file, a relative path is enough for in-memory rollovers.
+        max_lines : int
+            The number of lines after which the active segment is rolled over.
+        max_bytes : int
+            The size in bytes after which the active segment is rolled over.
+        keep_segments : int
+            The number of archived segments retained, 0 drops full segments.
+        keep_lines : int
+            The number of last lines carried over to the new active segment, fewer than `max_lines`
+            so that the new active segment is not full right away.
+        """
+        if max_lines and keep_lines >= max_lines:
+            raise ValueError(f"The {keep_lines} lines kept fill a segment of {max_lines} lines, keep fewer lines.")
+        self.file_path = file_path
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.keep_segments = keep_segments
+        self.keep_lines = keep_lines
+
+    def segment_path(self, index: int) -> PurePath:
+        """
+        Get the path of an archived segment.
+
+        Parameters
+        ----------
+        index : int
+            The index of the segment, 1 being the most recent.
+
+        Returns
+        -------
+        PurePath
+            The path of the segment e.g. "changes.1.txt".
+        """
+        return self.file_path.with_name(f"{self.file_path.stem}.{index}{self.file_path.suffix}")
+
+    def patterns(self) -> list:
+        """
+        Get the glob patterns matching the data file and its archived segments.
+
+        Returns
+        -------
+        list
+            The patterns, relative like the data file path.
+        """
+        return [self.file_path.as_posix(), self.file_path.with_name(f"{self.file_path.stem}.*{self.file_path.suffix}").as_posix()]
+
+    def tail(self, number_of_lines: int) -> str:
+        """
+        Read the last lines of the active segment, reading the file backwards by blocks.
+
+        Parameters
+        ----------
+        number_of_lines : int
+            The number of lines to read.
+
+        Returns
+        -------
+        str
+            The last lines, with their line endings.
+        """
+        if number_of_lines <= 0 or not Path(self.file_path).exists():
+            return ""
+        with open(self.file_path, "rb") as f:
+            position = f.seek(0, 2)
+            data = b""
+            # One more line ending than lines is needed to be sure the first line is complete
+            while position > 0 and data.count(b"\n") <= number_of_lines:
+                size = min(self.BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                data = f.read(size) + data
+        return b"".join(data.splitlines(keepends=True)[-number_of_lines:]).decode()
+
+    def is_full(self) -> bool:
+        """
+        Check if the active segment reached its size or line limit.
+
+        Returns
+        -------
+        bool
+            True if the active segment must be rolled over, False otherwise.
+        """
+        if not Path(self.file_path).exists():
+            return False
+        if self.max_bytes and Path(self.file_path).stat().st_size > self.max_bytes:
+            return True
+        return bool(self.max_lines) and self.tail(self.max_lines + 1).count("\n") > self.max_lines
+
+    def is_full_content(self, content: str) -> bool:
+        """
+        Check if an in-memory active segment reached its size or line limit.
+
+        Parameters
+        ----------
+        content : str
+            The content of the active segment.
+
+        Returns
+        -------
+        bool
+            True if the active segment must be rolled over, False otherwise.
+        """
+        if self.max_bytes and len(content.encode()) > self.max_bytes:
+            return True
+        return bool(self.max_lines) and content.count("\n") > self.max_lines
+
+    def rollover(self) -> list:
+        """
+        Archive the active segment on disk, drop the segments beyond retention and start a new active segment.
+
+        Returns
+        -------
+        list
+            The paths created, modified or deleted.
+        """
+        active = Path(self.file_path)
+        carried_over = self.tail(self.keep_lines)
+        existing = {index: Path(self.segment_path(index)) for index in self.__segment_indexes()}
+        new_segments = self.__shift(list(existing))
+
+        changed = [active]
+        for index in sorted(existing):
+            if index not in new_segments.values():
+                existing[index].unlink()
+                changed.append(existing[index])
+        for index in sorted(new_segments, reverse=True):
+            source = new_segments[index]
+            target = Path(self.segment_path(index))
+            if source == 0:
+                active.replace(target)
+            else:
+                existing[source].replace(target)
+            changed.append(target)
+        active.write_text(carried_over)
+        return sorted(set(changed))
+
+    def rollover_contents(self, content: str, segments: dict) -> dict:
+        """
+        Compute the same rollover as `rollover` on in-memory contents.
+
+        Parameters
+        ----------
+        content : str
+            The content of the active segment.
+        segments : dict
+            The content of each existing archived segment by index.
+
+        Returns
+        -------
+        dict
+            The new content of each file by relative path, None for deleted files.
+        """
+        new_segments = self.__shift(list(segments))
+        files = {self.segment_path(index).as_posix(): None for index in segments}
+        for index, source in new_segments.items():
+            files[self.segment_path(index).as_posix()] = content if source == 0 else segments[source]
+        lines = content.splitlines(keepends=True)
+        files[self.file_path.as_posix()] = "".join(lines[-self.keep_lines:]) if self.keep_lines else ""
+        return files
+
+    def __segment_indexes(self) -> list:
+        """
+        List the archived segments found on disk.
+
+        Returns
+        -------
+        list
+            The indexes of the segments.
+        """
+        prefix = f"{self.file_path.stem}."
+        indexes = []
+        for path in Path(self.file_path).parent.glob(f"{prefix}*{self.file_path.suffix}"):
+            index = path.name[len(prefix):len(path.name) - len(self.file_path.suffix)]
+            if index.isdigit():
+                indexes.append(int(index))
+        return indexes
+
+    def __shift(self, indexes: list) -> dict:
+        """
+        Shift the archived segments by one to make room for the active one, within retention.
+
+        Parameters
+        ----------
+        indexes : list
+            The indexes of the existing segments.
+
+        Returns
+        -------
+        dict
+            The index each retained segment comes from by its new index, 0 being the active segment.
+        """
+        new_segments = {index + 1: index for index in indexes if index + 1 <= self.keep_segments}
+        if self.keep_segments:
+            new_segments[1] = 0
+        return new_segments
@@ -1,10 +1,21 @@
-import time
 import random
-from faker import Faker
-from pathlib import Path
+import subprocess
+import asyncio
+from contextlib import nullcontext, AbstractContextManager
+from pathlib import Path, PurePosixPath
 from loguru import logger
-from datetime import datetime
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Iterator
 from utils.git_utils import GitUtils
+from utils.git_backends import GitBackend
+from utils.background_pusher import BackgroundPusher
+from utils.data_log import DataLog
+from utils.object_cache import ObjectCache
+from utils.repository_cache import RepositoryCache
+from utils.run_journal import RunJournal
+from utils.sentences import SentenceGenerator
+from utils.github_client import GitHubClient
+from utils.tracing import tracer
 
 
 class GenerateChanges: 
@@ -12,6 +23,12 @@ class GenerateChanges:
     Generate random sentence in a file from 0 to 10 times.
     Each sentence is a commit message and will do a commit to a Github repository.
     """
+    COMMIT_MODES = ("each", "batch", "fast-import", "pipeline")
+    CLONE_STRATEGIES = ("full", "shallow", "blobless", "sparse")
+    BACKENDS = ("git", "api")
+    SENTENCE_GENERATORS = ("builtin", "faker")
+    STAGING_MODES = ("all", "targeted")
+    PROMOTION_STRATEGIES = ("pull-request", "direct")
     
     def __init__(
             self, 
@@ -24,7 +41,30 @@ class GenerateChanges:
             repository_name:str,
             source_branch:str,
             target_branch:str,
-            prod_branch:str
+            prod_branch:str,
+            commit_mode:str="each",
+            clone_strategy:str="full",
+            clone_depth:int=1,
+            github_api_url:str=GitHubClient.API_URL,
+            github_timeout:float=10.0,
+            github_max_retries:int=4,
+            github_mutations_per_minute:int=80,
+            merge_timeout:float=60.0,
+            backend:str="git",
+            segment_max_lines:int=None,
+            segment_max_bytes:int=None,
+            keep_segments:int=0,
+            keep_lines:int=0,
+            sentence_generator:str="builtin",
+            sentence_seed:int=None,
+            object_cache:str=None,
+            repository_cache:str=None,
+            repository_cache_format:str="bundle",
+            staging:str="all",
+            index_caches:bool=False,
+            promotion:str="pull-request",
+            run_journal:str=None,
+            git_library:str="subprocess"
         ) -> None: 
         """
         Constructor of the GenerateChanges class.
@@ -52,9 +92,101 @@ class GenerateChanges:
             The target branch of the repository e.g. "develop".
         prod_branch : str
             The production branch of the repository e.g. "main".
-        timer : int
-            The time to wait before merging the pull request to avoid errors.
+        commit_mode : str
+            How the generated commits are sent to the remote repository:
+            "each" pushes after every commit, "batch" creates every commit
+            locally then pushes them all at once, "fast-import" streams every
+            commit to a single `git fast-import` process then pushes them all at once,
+            "pipeline" pushes after every commit from a background thread while the next
+            ones are created, the commits created during a push are pushed together.
+        clone_strategy : str
+            How the repository is cloned: "full" clones the whole history, "shallow"
+            only the last `clone_depth` commits, "blobless" the whole history without
+            file contents and "sparse" is a shallow and blobless clone with only the
+            data file checked out.
+        clone_depth : int
+            The number of commits fetched by the "shallow" and "sparse" clone strategies.
+        github_api_url : str
+            The base URL of the GitHub REST API.
+        github_timeout : float
+            The timeout of each GitHub API request, in seconds.
+        github_max_retries : int
+            The number of times a failed GitHub API request is retried.
+        github_mutations_per_minute : int
+            The number of GitHub API calls creating or changing content sent per minute with
+            the token, shared by every workflow using it.
+        merge_timeout : float
+            The longest time to wait for a pull request to be mergeable, in seconds.
+        backend : str
+            How the commits are created: "git" clones the repository and pushes local
+            commits, "api" builds them remotely with the GitHub Git Data API without
+            any clone nor `git` binary, in which case the commit mode and the clone
+            strategy are not used.
+        segment_max_lines : int
+            Roll the data file over once it has more lines than this, instead of cleaning it each month.
+            It is checked before the commits of a run, which can add up to 20 lines past it.
+        segment_max_bytes : int
+            Roll the data file over once it is bigger than this, instead of cleaning it each month,
+            checked before the commits of a run like `segment_max_lines`.
+        keep_segments : int
+            The number of rolled over segments of the data file retained next to it.
+        keep_lines : int
+            The number of last lines of the data file kept when it is rolled over, fewer than `segment_max_lines`.
+        sentence_generator : str
+            How the sentences are generated: "builtin" uses a lightweight generator with a
+            built-in word table, "faker" uses the Faker library which is slower to load.
+        sentence_seed : int
+            The seed of the sentence generator, to generate the same sentences on each run.
+        object_cache : str
+            The folder of a persistent object store shared by the clones of the host, each clone
+            only downloads the objects missing from it.
+        repository_cache : str
+            The folder of a copy of the repository kept between runs, e.g. on a mounted volume.
+            The repository is restored from it instead of cloned, then fetched, and the copy is
+            refreshed after each successful run.
+        repository_cache_format : str
+            How the repository is cached: "bundle" keeps a git bundle file, for full clones only,
+            and "directory" a copy of the `.git` folder.
+        staging : str
+            How the changes are staged before each commit: "all" adds and checks the whole
+            working tree, "targeted" only the data file and its segments, in a constant time
+            whatever the size of the repository.
+        index_caches : bool
+            Enable the untracked cache, the split index and the file system monitor, when git
+            supports it, to speed up the commands reading the working tree of a large repository.
+        promotion : str
+            How the changes are promoted to production: "pull-request" creates, labels and merges
+            a pull request to each branch, "direct" merges without pull requests and falls back
+            to them when GitHub refuses it.
+        run_journal : str
+            The folder of the journals of the runs, one per repository and workflow. A run failing
+            leaves its journal, and the next run resumes it instead of starting a new one.
+        git_library : str
+            How the commit loop runs git: "subprocess" spawns the `git` binary for each command,
+            "dulwich" works in process with the optional Dulwich library, for full clones without
+            the index caches. The other git operations always use the `git` binary.
         """
+        if commit_mode not in self.COMMIT_MODES:
+            raise ValueError(f"Unsupported commit mode '{commit_mode}', expected one of {self.COMMIT_MODES}.")
+        if sentence_generator not in self.SENTENCE_GENERATORS:
+            raise ValueError(f"Unsupported sentence generator '{sentence_generator}', expected one of {self.SENTENCE_GENERATORS}.")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported backend '{backend}', expected one of {self.BACKENDS}.")
+        if clone_strategy not in self.CLONE_STRATEGIES:
+            raise ValueError(f"Unsupported clone strategy '{clone_strategy}', expected one of {self.CLONE_STRATEGIES}.")
+        if promotion not in self.PROMOTION_STRATEGIES:
+            raise ValueError(f"Unsupported promotion strategy '{promotion}', expected one of {self.PROMOTION_STRATEGIES}.")
+        if staging not in self.STAGING_MODES:
+            raise ValueError(f"Unsupported staging mode '{staging}', expected one of {self.STAGING_MODES}.")
+        if repository_cache and repository_cache_format == "bundle" and clone_strategy != "full":
+            raise ValueError(f"Unsupported clone strategy '{clone_strategy}' for a bundle repository cache, expected 'full'.")
+        if repository_cache and object_cache:
+            raise ValueError("The repository cache and the object cache can not be used together, pick one.")
+        if git_library == "dulwich" and (clone_strategy != "full" or index_caches):
+            raise ValueError(f"Unsupported clone strategy '{clone_strategy}' or index caches for the dulwich git library, expected a 'full' clone without index caches.")
+        if segment_max_lines and keep_lines >= segment_max_lines:
+            raise ValueError(f"The {keep_lines} lines kept fill a segment of {segment_max_lines} lines, keep fewer lines.")
+
         project_root = Path(__file__).resolve().parent.parent
         self.data_folder = project_root / data_folder_name
         self.file_path = self.data_folder / f"{data_file_name}.txt"
@@ -62,12 +194,46 @@ class GenerateChanges:
         self.repository_url = repository_url
         self.user_email = user_email
         self.github_access_token = github_access_token
+        self.github_client = GitHubClient.shared(
+            github_access_token, 
+            api_url=github_api_url, 
+            timeout=github_timeout, 
+            max_retries=github_max_retries,
+            mutations_per_minute=github_mutations_per_minute
+        )
         self.repository_owner = repository_owner
         self.repository_name = repository_name
         self.source_branch = source_branch
         self.target_branch = target_branch
         self.prod_branch = prod_branch
-        self.timer = 2
+        self.commit_mode = commit_mode
+        self.clone_strategy = clone_strategy
+        self.clone_depth = clone_depth if clone_strategy in ("shallow", "sparse") else None
+        self.merge_timeout = merge_timeout
+        self.backend = backend
+        self.sentence_generator = sentence_generator
+        self.sentence_seed = sentence_seed
+        # Created on first use and drawn from by every day of a run, so that a seeded run does not replay its sentences
+        self.sentence_source = None
+        self.object_cache = ObjectCache(object_cache) if object_cache else None
+        self.staging = staging
+        self.promotion = promotion
+        self.run_journal = run_journal
+        self.journal = RunJournal()
+        self.pusher = None
+        self.warm_clone = False
+        self.index_caches = index_caches
+        self.git = GitBackend.create(git_library)
+        self.repository_cache = RepositoryCache(repository_cache, repository_cache_format) if repository_cache else None
+        self.data_log_settings = None
+        if segment_max_lines or segment_max_bytes:
+            self.data_log_settings = {
+                "max_lines": segment_max_lines, 
+                "max_bytes": segment_max_bytes, 
+                "keep_segments": keep_segments, 
+                "keep_lines": keep_lines
+            }
+        self.data_log = DataLog(self.file_path, **self.data_log_settings) if self.data_log_settings else None
         
     def __is_new_month(self, date: datetime) -> bool:
         """
@@ -80,6 +246,30 @@ class GenerateChanges:
         """
         return date.day == 1
     
+    def __data_file_name(self) -> str:
+        """
+        Get the path of the data file relative to the repository root.
+        
+        Returns
+        -------
+        str
+            The relative path of the data file.
+        """
+        return self.file_path.relative_to(self.data_folder).as_posix()
+    
+    def __data_file_patterns(self) -> list:
+        """
+        Get the patterns matching the data file, and its segments when it is rolled over.
+        
+        Returns
+        -------
+        list
+            The patterns relative to the repository root.
+        """
+        if self.data_log:
+            return DataLog(PurePosixPath(self.__data_file_name())).patterns()
+        return [self.__data_file_name()]
+    
     def __generate_sentences(self, number_of_sentences: int) -> list:
         """
         Generate random sentence in a list according to number passed as parameter.
@@ -94,74 +284,285 @@ class GenerateChanges:
         list
             The list of sentences.
         """
-        faker = Faker()
-        return [f":rocket: feat: {faker.sentence(nb_words=6)}" for _ in range(number_of_sentences)]
+        if self.sentence_generator == "faker":
+            if self.sentence_source is None:
+                # Faker loads all its providers, only import it when explicitly asked for
+                from faker import Faker
+                self.sentence_source = Faker()
+                if self.sentence_seed is not None:
+                    self.sentence_source.seed_instance(self.sentence_seed)
+            return [f":rocket: feat: {self.sentence_source.sentence(nb_words=6)}" for _ in range(number_of_sentences)]
+        if self.sentence_source is None:
+            self.sentence_source = SentenceGenerator(seed=self.sentence_seed)
+        return [f":rocket: feat: {sentence}" for sentence in self.sentence_source.sentences(number_of_sentences, nb_words=6)]
+    
+    def __open_journal(self, workflow: str, **run) -> None:
+        """
+        Open the journal of the run, resuming the run left by a failed attempt with the number
+        of commits it drew.
+        
+        Parameters
+        ----------
+        workflow : str
+            The name of the workflow, each one has its own journal e.g. "daily".
+        **run
+            The values identifying the run e.g. the backfilled dates, the journal of a different
+            run is never resumed.
+        """
+        path = Path(self.run_journal) / f"{GitUtils.repository_slug(self.repository_url)}.{workflow}.json" if self.run_journal else None
+        self.journal = RunJournal(path)
+        if not self.journal.resumed:
+            self.journal.record(started=datetime.now(timezone.utc).isoformat(), **run)
+            return
+        if any(self.journal.get(key) != value for key, value in run.items()):
+            raise ValueError(f"The journal {path} belongs to another unfinished run, delete it to start a new one.")
+        logger.info(f"Resuming the run started at {self.journal.get('started')}...")
+        self.number_of_commits = self.journal.get("number_of_commits", self.number_of_commits)
         
     def __clone_and_configure(self) -> None:
         """
-        Clone the repository and configure Git.
+        Clone the repository, or restore it from the cache, and configure Git.
         """
-        logger.info("Cloning the repository...")
-        GitUtils.clone_repository(
-            repository_url=self.repository_url, 
-            local_path=self.data_folder, 
-            github_access_token=self.github_access_token
-        )
+        if self.repository_cache and not self.data_folder.exists():
+            with tracer.span("restore cache", format=self.repository_cache.format) as span:
+                span.set(restored=self.repository_cache.restore(
+                    repository_url=self.repository_url, 
+                    local_path=self.data_folder, 
+                    github_access_token=self.github_access_token, 
+                    branch_name=self.target_branch
+                ))
+        self.warm_clone = self.data_folder.exists()
+        if self.warm_clone:
+            if self.journal.resumed:
+                # The failed attempt may have left changes it did not commit
+                GitUtils.discard_changes(local_path=self.data_folder)
+            # A clone restored from the cache or left by a previous run misses the latest commits
+            GitUtils.fetch_repository(
+                local_path=self.data_folder, 
+                repository_url=self.repository_url, 
+                github_access_token=self.github_access_token
+            )
+        else:
+            reference = None
+            if self.object_cache:
+                reference = self.object_cache.update(self.repository_url, self.github_access_token)
+            logger.info("Cloning the repository...")
+            # The store must not be maintained while the clone reads it
+            with self.object_cache.lock(reference, exclusive=False) if reference else nullcontext():
+                GitUtils.clone_repository(
+                    repository_url=self.repository_url, 
+                    local_path=self.data_folder, 
+                    github_access_token=self.github_access_token,
+                    depth=self.clone_depth,
+                    filter_blobs=self.clone_strategy in ("blobless", "sparse"),
+                    sparse_paths=self.__data_file_patterns() if self.clone_strategy == "sparse" else None,
+                    reference=reference
+                )
         logger.info("Configuring Git user...")
-        GitUtils.config_user(
+        self.git.config_user(
             local_path=self.data_folder,
             user_email=self.user_email
         )
+        if self.index_caches:
+            GitUtils.enable_index_caches(local_path=self.data_folder)
 
     def __setup_branches(self) -> None:
         """
         Set up the target and source branches.
         """
         logger.info(f"Checking if {self.target_branch} exists...")
-        GitUtils.check_or_create_branch(
+        self.git.check_or_create_branch(
             local_path=self.data_folder, 
             branch_name=self.target_branch
         )
         logger.info(f"Pulling {self.target_branch} to have recent changes...")
-        GitUtils.pull_branch(
+        self.git.pull_branch(
             local_path=self.data_folder, 
-            branch_name=self.target_branch
+            branch_name=self.target_branch,
+            depth=self.clone_depth
         )
         logger.info(f"Creating {self.source_branch} from {self.target_branch}...")
-        GitUtils.check_or_create_branch(
-            local_path=self.data_folder, 
-            branch_name=self.source_branch
-        )       
+        if self.warm_clone:
+            # The branch left by a previous run in the clone was merged, it starts again from the target branch
+            GitUtils.reset_branch(
+                local_path=self.data_folder, 
+                branch_name=self.source_branch, 
+                start_point=self.target_branch
+            )
+        else:
+            self.git.check_or_create_branch(
+                local_path=self.data_folder, 
+                branch_name=self.source_branch
+            )       
+        
+    def __resume_source_branch(self) -> list:
+        """
+        Reset the source branch to the commits pushed by the previous attempts of the run,
+        the commits they created without pushing them are dropped.
         
-    def __generate_and_commit(self) -> None:
+        Returns
+        -------
+        list
+            The subjects of the commits already pushed, oldest first.
         """
-        Generate sentences and commit them.
+        if not GitUtils.fetch_branch(local_path=self.data_folder, branch_name=self.source_branch):
+            GitUtils.reset_branch(local_path=self.data_folder, branch_name=self.source_branch, start_point=self.target_branch)
+            return []
+        GitUtils.reset_branch(local_path=self.data_folder, branch_name=self.source_branch, start_point=f"origin/{self.source_branch}")
+        return GitUtils.commit_subjects(local_path=self.data_folder, revision_range=f"{self.target_branch}..{self.source_branch}")
+        
+    def __commit(self, commit_message: str, paths: list) -> None:
+        """
+        Commit the current changes, pushing them right away unless commits are batched,
+        or in the background when they are pipelined.
+        
+        Parameters
+        ----------
+        commit_message : str
+            The commit message.
+        paths : list
+            The paths changed, the only ones staged with the "targeted" staging mode.
+        """
+        paths = paths if self.staging == "targeted" else None
+        if self.commit_mode != "each":
+            committed = self.git.add_commit(
+                local_path=self.data_folder, 
+                commit_message=commit_message,
+                paths=paths
+            )
+            if committed and self.pusher:
+                self.pusher.notify()
+        else:
+            self.git.add_commit_push(
+                local_path=self.data_folder, 
+                commit_message=commit_message, 
+                branch_name=self.source_branch,
+                paths=paths
+            )
+        
+    def __appended_contents(self, sentences: list, content: str) -> Iterator[tuple[str, str, None]]:
+        """
+        Yield the content of the data file after each sentence is appended to it.
+        
+        Parameters
+        ----------
+        sentences : list
+            The sentences to append, each one is also the commit message.
+        content : str
+            The content of the data file before the first sentence.
+        
+        Yields
+        ------
+        tuple[str, str, None]
+            The commit message, the full content of the file and no date to commit now.
         """
-        sentences = self.__generate_sentences(self.number_of_commits)
         for sentence in sentences:
-            logger.info(f"Write and commit '{sentence}' to {self.source_branch}...")
+            content += sentence + "\n"
+            yield sentence, content, None
+        
+    def __backfilled_commits(self, start_date: date, end_date: date) -> Iterator[tuple[str, str | dict, datetime]]:
+        """
+        Simulate the daily runs between two dates and yield the commits of the days the developer works,
+        with the same mood and number of commits draws, and the same cleaning or rollover of the file.
+        The total number of commits is kept in `number_of_commits`.
+        
+        Parameters
+        ----------
+        start_date : date
+            The first simulated day.
+        end_date : date
+            The last simulated day, included.
+        
+        Yields
+        ------
+        tuple[str, str | dict, datetime]
+            The commit message, the full content of the file or the contents by path when the file 
+            is rolled over, and the date of the commit.
+        """
+        file_name = self.__data_file_name()
+        content = self.file_path.read_text() if self.file_path.exists() else ""
+        data_log = DataLog(PurePosixPath(file_name), **self.data_log_settings) if self.data_log else None
+        segments = {}
+        if data_log:
+            for index in range(1, data_log.keep_segments + 1):
+                segment_path = self.data_folder / data_log.segment_path(index)
+                if segment_path.exists():
+                    segments[index] = segment_path.read_text()
+        
+        self.number_of_commits = 0
+        day = start_date
+        while day <= end_date:
+            number_of_commits = random.randint(1, 20)
+            if self.__will_i_work_hard_today():
+                # The job is scheduled at 10:00 UTC and a run commits every few seconds
+                commit_date = datetime.combine(day, time(10), tzinfo=timezone.utc)
+                if data_log:
+                    if data_log.is_full_content(content):
+                        files = data_log.rollover_contents(content, segments)
+                        content = files[file_name]
+                        segments = {
+                            index: files[data_log.segment_path(index).as_posix()] 
+                            for index in range(1, data_log.keep_segments + 1) 
+                            if files.get(data_log.segment_path(index).as_posix()) is not None
+                        }
+                        yield ":rocket: feat: rolled over the file", files, commit_date
+                elif self.__is_new_month(commit_date) and content:
+                    content = ""
+                    yield ":rocket: feat: cleaned the file", content, commit_date
+                for sentence in self.__generate_sentences(number_of_commits):
+                    commit_date += timedelta(seconds=random.randint(1, 10))
+                    content += sentence + "\n"
+                    yield sentence, content, commit_date
+                self.number_of_commits += number_of_commits
+            day += timedelta(days=1)
+        
+    def __generate_and_commit(self, sentences: list) -> None:
+        """
+        Commit the sentences.
+        
+        Parameters
+        ----------
+        sentences : list
+            The sentences to commit, each one is also the commit message.
+        """
+        if self.commit_mode == "fast-import":
+            GitUtils.fast_import_commits(
+                local_path=self.data_folder, 
+                branch_name=self.source_branch, 
+                file_name=self.__data_file_name(), 
+                commits=self.__appended_contents(sentences, self.file_path.read_text() if self.file_path.exists() else ""), 
+                author_email=self.user_email
+            )
+        else:
             with self.file_path.open("a") as f:
-                f.write(sentence + "\n")
-                
-            GitUtils.add_commit_push(
+                for sentence in sentences:
+                    logger.info(f"Write and commit '{sentence}' to {self.source_branch}...")
+                    f.write(sentence + "\n")
+                    f.flush()
+                    self.__commit(sentence, [self.file_path])
+            
+        if self.commit_mode in ("batch", "fast-import"):
+            logger.info(f"Pushing {len(sentences)} commits to {self.source_branch} at once...")
+            self.git.push_branch(
                 local_path=self.data_folder, 
-                commit_message=sentence, 
                 branch_name=self.source_branch
-        )     
+            )
       
     def __cleanup_file(self) -> None:
         """
-        Clean up the file if it's the first day of the month.
+        Roll the file over if it is full, or clean it up if it's the first day of the month 
+        when it is not split in segments.
         """
-        if self.__is_new_month(datetime.now()):
+        if self.data_log:
+            if self.data_log.is_full():
+                logger.info("The file is full, rolling it over...")
+                changed = self.data_log.rollover()
+                self.__commit(":rocket: feat: rolled over the file", changed)
+        elif self.__is_new_month(datetime.now()):
             logger.info("It's the first day of the month, cleaning the file...")
             with self.file_path.open("w") as f:
                 f.write("")
-            GitUtils.add_commit_push(
-                local_path=self.data_folder, 
-                commit_message=":rocket: feat: cleaned the file", 
-                branch_name=self.source_branch
-            )     
+            self.__commit(":rocket: feat: cleaned the file", [self.file_path])
         
     def __create_and_merge_pr(
             self, 
@@ -184,25 +585,368 @@ class GenerateChanges:
         body : str
             The body of the pull request.
         """
-        logger.info(f"Creating pull request from {source_branch} to {target_branch}...")
-        pr = GitUtils.create_pull_request(
-            repo_owner=self.repository_owner, 
-            repo_name=self.repository_name, 
-            source_branch=source_branch, 
-            target_branch=target_branch, 
-            title=title,
-            body=body, 
-            github_access_token=self.github_access_token
-        )
-        logger.info(f'Waiting {self.timer} seconds for the pull request to be ready...')
-        time.sleep(self.timer)
-        GitUtils.merge_pull_request(
-            repo_owner=self.repository_owner, 
-            repo_name=self.repository_name, 
-            pull_number=pr["number"], 
-            github_access_token=self.github_access_token
+        with tracer.span("pull request", source_branch=source_branch, target_branch=target_branch):
+            number = self.journal.result(f"pull request {target_branch}")
+            if number is None:
+                logger.info(f"Creating pull request from {source_branch} to {target_branch}...")
+                pr = GitUtils.create_pull_request(
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    source_branch=source_branch, 
+                    target_branch=target_branch, 
+                    title=title,
+                    body=body, 
+                    github_access_token=self.github_access_token,
+                    labels=(),
+                    client=self.github_client
+                )
+                number = pr["number"]
+                self.journal.complete(f"pull request {target_branch}", number)
+            # The merge waits for the label so that it never triggers the CI/CD,
+            # labeling a resumed pull request again is harmless
+            logger.info(f"Labeling pull request #{number}...")
+            GitUtils.add_labels(
+                repo_owner=self.repository_owner, 
+                repo_name=self.repository_name, 
+                issue_number=number, 
+                labels=["skip-ci"], 
+                github_access_token=self.github_access_token,
+                client=self.github_client
+            )
+            logger.info(f"Waiting for pull request #{number} to be mergeable...")
+            pr = GitUtils.wait_for_mergeable(
+                repo_owner=self.repository_owner, 
+                repo_name=self.repository_name, 
+                pull_number=number, 
+                github_access_token=self.github_access_token,
+                timeout=self.merge_timeout,
+                client=self.github_client
+            )
+            if not pr.get("merged"):
+                GitUtils.merge_pull_request(
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    pull_number=number, 
+                    github_access_token=self.github_access_token,
+                    client=self.github_client
+                )
+            self.journal.complete(f"merged {target_branch}")
+        
+    async def __create_and_merge_pr_async(
+            self, 
+            source_branch: str,
+            target_branch: str, 
+            title: str, 
+            body: str
+        ) -> None:
+        """
+        Create and merge a pull request, labeling it while waiting for it to be mergeable.
+        
+        Parameters
+        ----------
+        source_branch : str
+            The source branch of the pull request e.g. "feature/branch_name".
+        target_branch : str
+            The target branch of the pull request e.g. "develop".
+        title : str
+            The title of the pull request.
+        body : str
+            The body of the pull request.
+        """
+        with tracer.span("pull request", source_branch=source_branch, target_branch=target_branch):
+            number = self.journal.result(f"pull request {target_branch}")
+            if number is None:
+                logger.info(f"Creating pull request from {source_branch} to {target_branch}...")
+                pr = await asyncio.to_thread(
+                    GitUtils.create_pull_request,
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    source_branch=source_branch, 
+                    target_branch=target_branch, 
+                    title=title,
+                    body=body, 
+                    github_access_token=self.github_access_token,
+                    labels=(),
+                    client=self.github_client
+                )
+                number = pr["number"]
+                self.journal.complete(f"pull request {target_branch}", number)
+            logger.info(f"Labeling pull request #{number} while waiting for it to be mergeable...")
+            # The merge waits for the label so that it never triggers the CI/CD,
+            # labeling a resumed pull request again is harmless
+            _, pr = await asyncio.gather(
+                asyncio.to_thread(
+                    GitUtils.add_labels,
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    issue_number=number, 
+                    labels=["skip-ci"], 
+                    github_access_token=self.github_access_token,
+                    client=self.github_client
+                ),
+                asyncio.to_thread(
+                    GitUtils.wait_for_mergeable,
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    pull_number=number, 
+                    github_access_token=self.github_access_token,
+                    timeout=self.merge_timeout,
+                    client=self.github_client
+                )
+            )
+            if not pr.get("merged"):
+                await asyncio.to_thread(
+                    GitUtils.merge_pull_request,
+                    repo_owner=self.repository_owner, 
+                    repo_name=self.repository_name, 
+                    pull_number=number, 
+                    github_access_token=self.github_access_token,
+                    client=self.github_client
+                )
+            self.journal.complete(f"merged {target_branch}")
+        
+    def __pull_requests(self) -> list:
+        """
+        Get the pull requests promoting the changes to production, in order, without the ones
+        merged by the previous attempts of the run.
+        
+        Returns
+        -------
+        list
+            The arguments of each pull request.
+        """
+        pull_requests = [
+            {
+                "source_branch": self.source_branch, 
+                "target_branch": self.target_branch,
+                "title": ":rocket: Super Dev is working hard today!",
+                "body": f"I'm proud, I committed {self.number_of_commits} changes today."
+            },
+            {
+                "source_branch": self.target_branch, 
+                "target_branch": self.prod_branch,
+                "title": ":rocket: Merging changes to main!",
+                "body": "Incredible content in production because i'm a super developer!"
+            }
+        ]
+        return [pull_request for pull_request in pull_requests if not self.journal.done(f"merged {pull_request['target_branch']}")]
+        
+    def __promote_directly(self) -> list:
+        """
+        Promote the changes to production without pull requests, each merge commit is marked
+        "[skip ci]" as the pull requests are labeled "skip-ci". A full or blobless clone merges
+        locally and pushes both branches at once, otherwise GitHub merges one branch after the other,
+        as it does for a resumed run whose clone may be gone.
+        
+        Returns
+        -------
+        list
+            The arguments of the pull requests still needed, from the first merge GitHub refused,
+            e.g. because a protection of the branch requires a pull request.
+        """
+        pull_requests = self.__pull_requests()
+        messages = [f"{pull_request['title']} [skip ci]\n\n{pull_request['body']}" for pull_request in pull_requests]
+        with tracer.span("direct promotion") as span:
+            if self.backend == "git" and self.clone_strategy in ("full", "blobless") and not self.journal.resumed:
+                to_target = GitUtils.merge_commit(
+                    local_path=self.data_folder, 
+                    base=f"origin/{self.target_branch}", 
+                    head=self.source_branch, 
+                    commit_message=messages[0]
+                )
+                to_prod = GitUtils.merge_commit(
+                    local_path=self.data_folder, 
+                    base=f"origin/{self.prod_branch}", 
+                    head=to_target, 
+                    commit_message=messages[1]
+                )
+                pushed = GitUtils.push_commits(
+                    local_path=self.data_folder, 
+                    commits={self.target_branch: to_target, self.prod_branch: to_prod}
+                )
+                remaining = [] if pushed else pull_requests
+                if pushed:
+                    self.journal.complete(f"merged {self.target_branch}")
+                    self.journal.complete(f"merged {self.prod_branch}")
+            else:
+                remaining = []
+                for index, (pull_request, message) in enumerate(zip(pull_requests, messages)):
+                    merged = GitUtils.merge_branch(
+                        repo_owner=self.repository_owner, 
+                        repo_name=self.repository_name, 
+                        base_branch=pull_request["target_branch"], 
+                        head=pull_request["source_branch"], 
+                        commit_message=message, 
+                        github_access_token=self.github_access_token,
+                        client=self.github_client
+                    )
+                    if not merged:
+                        remaining = pull_requests[index:]
+                        break
+                    self.journal.complete(f"merged {pull_request['target_branch']}")
+            span.set(fallback=len(remaining))
+        if remaining:
+            logger.warning(f"Falling back to {len(remaining)} pull requests.")
+        return remaining
+        
+    def __push_changes(self) -> None:
+        """
+        Commit and push the generated changes to the source branch. A resumed run only commits
+        the sentences its previous attempts did not push.
+        """
+        if self.journal.done("pushed"):
+            logger.info(f"The changes were already pushed to {self.source_branch}.")
+            return
+        if self.journal.get("sentences") is None:
+            self.journal.record(number_of_commits=self.number_of_commits, sentences=self.__generate_sentences(self.number_of_commits))
+        if self.backend == "api":
+            with tracer.span("remote commits", commits=self.number_of_commits):
+                self.__commit_remotely()
+            self.journal.complete("pushed")
+            return
+        with tracer.span("clone", strategy=self.clone_strategy):
+            self.__clone_and_configure()
+        with tracer.span("setup branches"):
+            self.__setup_branches()
+            pushed = self.__resume_source_branch() if self.journal.resumed else []
+        sentences = self.journal.get("sentences")
+        if pushed:
+            # The file was cleaned up before the first commit pushed
+            sentences = sentences[sum(subject in sentences for subject in pushed):]
+            logger.info(f"{len(pushed)} commits were already pushed, committing the {len(sentences)} remaining sentences...")
+        pusher = BackgroundPusher(self.data_folder, self.source_branch, self.git) if self.commit_mode == "pipeline" else None
+        try:
+            with pusher or nullcontext():
+                self.pusher = pusher
+                if not pushed:
+                    with tracer.span("cleanup"):
+                        self.__cleanup_file()
+                with tracer.span("commits", commits=len(sentences), mode=self.commit_mode) as span:
+                    self.__generate_and_commit(sentences)
+                    if pusher:
+                        logger.info(f"Waiting for the last background push to {self.source_branch}...")
+                        pusher.close()
+                        span.set(pushes=pusher.pushes)
+        finally:
+            self.pusher = None
+        self.journal.complete("pushed")
+        
+    def __commit_remotely(self) -> None:
+        """
+        Create the same commits as the local workflow with the GitHub Git Data API, on top of
+        the target branch, then point the source branch to the last one. A resumed run creates
+        them all again and forces the source branch to them.
+        """
+        repository = {
+            "repo_owner": self.repository_owner, 
+            "repo_name": self.repository_name, 
+            "github_access_token": self.github_access_token,
+            "client": self.github_client
+        }
+        file_name = self.__data_file_name()
+        parent = GitUtils.get_branch_sha(branch_name=self.target_branch, **repository)
+        if parent is None:
+            raise ValueError(f"Branch '{self.target_branch}' does not exist in the remote repository.")
+        tree = GitUtils.get_commit(commit_sha=parent, **repository)["tree"]["sha"]
+        content = GitUtils.get_file_content(file_name=file_name, ref=parent, **repository) or ""
+        
+        commits = []
+        if self.data_log:
+            data_log = DataLog(PurePosixPath(file_name), **self.data_log_settings)
+            if data_log.is_full_content(content):
+                logger.info("The file is full, rolling it over...")
+                segments = {}
+                for index in range(1, data_log.keep_segments + 1):
+                    segment = GitUtils.get_file_content(file_name=data_log.segment_path(index).as_posix(), ref=parent, **repository)
+                    if segment is not None:
+                        segments[index] = segment
+                files = data_log.rollover_contents(content, segments)
+                commits.append((":rocket: feat: rolled over the file", files, None))
+                content = files[file_name]
+        elif self.__is_new_month(datetime.now()) and content:
+            logger.info("It's the first day of the month, cleaning the file...")
+            content = ""
+            commits.append((":rocket: feat: cleaned the file", {file_name: content}, None))
+        commits += [
+            (commit_message, {file_name: content}, commit_date) 
+            for commit_message, content, commit_date in self.__appended_contents(self.journal.get("sentences"), content)
+        ]
+        
+        for commit_message, files, commit_date in commits:
+            logger.info(f"Creating commit '{commit_message}' with the GitHub API...")
+            tree = GitUtils.create_tree(base_tree=tree, files=files, **repository)
+            parent = GitUtils.create_commit(
+                commit_message=commit_message, 
+                tree=tree, 
+                parents=[parent], 
+                author_email=self.user_email, 
+                date=commit_date, 
+                **repository
+            )
+        
+        logger.info(f"Pointing {self.source_branch} to the {len(commits)} new commits...")
+        GitUtils.update_branch(
+            branch_name=self.source_branch, 
+            commit_sha=parent, 
+            create=GitUtils.get_branch_sha(branch_name=self.source_branch, **repository) is None, 
+            force=self.journal.resumed,
+            **repository
         )
         
+    def __delete_source_branch(self) -> None:
+        """
+        Delete the source branch from the remote repository once it is merged.
+        """
+        if self.journal.done("source branch deleted"):
+            return
+        with tracer.span("delete branch", branch=self.source_branch):
+            GitUtils.delete_remote_branch(
+                repo_owner=self.repository_owner, 
+                repo_name=self.repository_name, 
+                branch_name=self.source_branch, 
+                github_access_token=self.github_access_token,
+                client=self.github_client
+            )
+        self.journal.complete("source branch deleted")
+        
+    def __save_cache(self) -> None:
+        """
+        Refresh the cached copy of the repository once the changes are merged, with the merged
+        branches fetched and without the deleted source branch. A failure only costs the next
+        run a longer fetch or a clone, the run itself succeeded.
+        """
+        if not self.repository_cache or self.backend != "git" or not self.data_folder.exists():
+            return
+        with tracer.span("save cache", format=self.repository_cache.format):
+            try:
+                GitUtils.fetch_repository(
+                    local_path=self.data_folder, 
+                    repository_url=self.repository_url, 
+                    github_access_token=self.github_access_token
+                )
+                GitUtils.check_or_create_branch(
+                    local_path=self.data_folder, 
+                    branch_name=self.target_branch
+                )
+                GitUtils.delete_branch(
+                    local_path=self.data_folder, 
+                    branch_name=self.source_branch
+                )
+                self.repository_cache.save(self.repository_url, self.data_folder)
+            except (subprocess.CalledProcessError, OSError) as e:
+                logger.warning(f"Failed to save the repository to the cache: {e}")
+        
+    def __log_context(self, span) -> AbstractContextManager:
+        """
+        Bind the IDs of the run to the logs of the workflow, including the ones of its threads.
+        
+        Parameters
+        ----------
+        span : Span
+            The root span of the run, its trace ID is the run ID.
+        """
+        return logger.contextualize(run_id=span.trace_id, repository=f"{self.repository_owner}/{self.repository_name}")
+        
     def __will_i_work_hard_today(self) -> bool:
         """
         Used to simulate a developer's mood.
@@ -215,38 +959,141 @@ class GenerateChanges:
         """
         return random.random() < 0.8
   
+    def refresh_clone(self) -> None:
+        """
+        Fetch the clone kept between the runs of a long running process, so that the next run
+        has little left to fetch. Nothing is done before the first run cloned the repository.
+        """
+        if self.backend != "git" or not self.data_folder.exists():
+            return
+        with tracer.span("refresh clone"):
+            GitUtils.fetch_repository(
+                local_path=self.data_folder, 
+                repository_url=self.repository_url, 
+                github_access_token=self.github_access_token
+            )
+  
     def work_hard_workflow(self) -> None:
         """
-        Workflow to generate changes in the repository.
+        Workflow to generate changes in the repository, resuming the run of a failed attempt.
         """
-        if self.__will_i_work_hard_today():
+        self.__open_journal("daily")
+        if self.journal.resumed or self.__will_i_work_hard_today():
             logger.info("I'm a super developer, I may work hard today...")
             try:
-                self.__clone_and_configure()
-                self.__setup_branches()
-                self.__cleanup_file()
-                self.__generate_and_commit()
-                self.__create_and_merge_pr(
-                    source_branch=self.source_branch, 
-                    target_branch=self.target_branch,
-                    title=":rocket: Super Dev is working hard today!",
-                    body=f"I'm proud, I committed {self.number_of_commits} changes today."
-                )
-                self.__create_and_merge_pr(
-                    source_branch=self.target_branch, 
-                    target_branch=self.prod_branch,
-                    title=":rocket: Merging changes to main!",
-                    body="Incredible content in production because i'm a super developer!"
-                )
-                GitUtils.delete_remote_branch(
-                    repo_owner=self.repository_owner, 
-                    repo_name=self.repository_name, 
-                    branch_name=self.source_branch, 
-                    github_access_token=self.github_access_token
-                )
+                with tracer.span("workflow", repository=f"{self.repository_owner}/{self.repository_name}", backend=self.backend, commits=self.number_of_commits) as span, self.__log_context(span):
+                    self.__push_changes()
+                    for pull_request in self.__promote_directly() if self.promotion == "direct" else self.__pull_requests():
+                        self.__create_and_merge_pr(**pull_request)
+                    self.__delete_source_branch()
+                    self.__save_cache()
+                self.journal.finish()
+                logger.success(f"Workflow completed successfully with {self.number_of_commits} commits.")
+            except Exception as e:
+                logger.error(f"An error occurred during the workflow: {e}")
+                raise
+        else:
+            self.journal.finish()
+            logger.info("I'm a lazy developer because I did not work on my rest day.")
+            
+    def backfill_workflow(self, start_date: date, end_date: date) -> None:
+        """
+        Workflow to generate the history of the developer between two dates, e.g. when onboarding a repository.
+        The commits of every working day are dated and streamed to `git fast-import` in one pass,
+        pushed once, then promoted to production with the same pull requests as a daily run.
+        A failed backfill is resumed by the next one of the same dates, without pushing its commits again.
+        
+        Parameters
+        ----------
+        start_date : date
+            The first simulated day.
+        end_date : date
+            The last simulated day, included.
+        """
+        if self.backend != "git":
+            raise ValueError(f"Unsupported backend '{self.backend}' for a backfill, expected 'git'.")
+        if start_date > end_date:
+            raise ValueError(f"The backfill starts on {start_date}, after its end on {end_date}.")
+        
+        self.__open_journal("backfill", start_date=start_date.isoformat(), end_date=end_date.isoformat())
+        logger.info(f"I'm a super developer, backfilling my work from {start_date} to {end_date}...")
+        try:
+            with tracer.span("workflow", repository=f"{self.repository_owner}/{self.repository_name}", backend=self.backend, backfill=f"{start_date}/{end_date}") as span, self.__log_context(span):
+                with tracer.span("clone", strategy=self.clone_strategy):
+                    self.__clone_and_configure()
+                with tracer.span("setup branches"):
+                    self.__setup_branches()
+                with tracer.span("backfill") as span:
+                    pushed = self.__resume_source_branch() if self.journal.resumed and not self.journal.done("pushed") else []
+                    if self.journal.done("pushed") or pushed:
+                        # The commits are pushed at once, a previous attempt pushed them all
+                        created = self.journal.result("pushed") or len(pushed)
+                        logger.info(f"The {created} commits were already pushed to {self.source_branch}.")
+                    else:
+                        created = GitUtils.fast_import_commits(
+                            local_path=self.data_folder, 
+                            branch_name=self.source_branch, 
+                            file_name=self.__data_file_name(), 
+                            commits=self.__backfilled_commits(start_date, end_date), 
+                            author_email=self.user_email
+                        )
+                        self.journal.record(number_of_commits=self.number_of_commits)
+                        if created:
+                            logger.info(f"Pushing {created} commits to {self.source_branch} at once...")
+                            self.git.push_branch(
+                                local_path=self.data_folder, 
+                                branch_name=self.source_branch
+                            )
+                            self.journal.complete("pushed", created)
+                    span.set(commits=created)
+                    if not created:
+                        self.journal.finish()
+                        logger.info("I'm a lazy developer, I did not work on any of these days.")
+                        return
+                for pull_request in self.__promote_directly() if self.promotion == "direct" else self.__pull_requests():
+                    self.__create_and_merge_pr(**pull_request)
+                self.__delete_source_branch()
+                self.__save_cache()
+            self.journal.finish()
+            logger.success(f"Backfill completed successfully with {created} commits.")
+        except Exception as e:
+            logger.error(f"An error occurred during the backfill: {e}")
+            raise
+            
+    async def work_hard_workflow_async(self) -> None:
+        """
+        Workflow to generate changes in the repository, running independent GitHub API calls concurrently.
+        Pull requests are labeled while GitHub computes their mergeability, and the source branch
+        is deleted while the changes are promoted to production. The run of a failed attempt is resumed.
+        """
+        self.__open_journal("daily")
+        if self.journal.resumed or self.__will_i_work_hard_today():
+            logger.info("I'm a super developer, I may work hard today...")
+            try:
+                with tracer.span("workflow", repository=f"{self.repository_owner}/{self.repository_name}", backend=self.backend, commits=self.number_of_commits) as span, self.__log_context(span):
+                    await asyncio.to_thread(self.__push_changes)
+                    if self.promotion == "direct":
+                        pull_requests = await asyncio.to_thread(self.__promote_directly)
+                    else:
+                        pull_requests = self.__pull_requests()
+                    for pull_request in pull_requests[:-1]:
+                        await self.__create_and_merge_pr_async(**pull_request)
+                    # The source branch is merged once the last promotion starts, both are let finish
+                    # on a failure so that the journal records what the other one completed
+                    results = await asyncio.gather(
+                        *[self.__create_and_merge_pr_async(**pull_request) for pull_request in pull_requests[-1:]],
+                        asyncio.to_thread(self.__delete_source_branch),
+                        return_exceptions=True
+                    )
+                    for result in results:
+                        if isinstance(result, BaseException):
+                            raise result
+                    await asyncio.to_thread(self.__save_cache)
+                self.journal.finish()
                 logger.success(f"Workflow completed successfully with {self.number_of_commits} commits.")
             except Exception as e:
                 logger.error(f"An error occurred during the workflow: {e}")
                 raise
         else:
+            self.journal.finish()
             logger.info("I'm a lazy developer because I did not work on my rest day.")
\ No newline at end of file
@@ -0,0 +1,180 @@
+import io
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from loguru import logger
+from utils.git_utils import GitUtils
+from utils.tracing import tracer
+
+
+class GitBackend(ABC):
+    """
+    The git operations of the commit loop of a workflow: configuring the user, switching and
+    pulling branches, committing and pushing. They run once per commit, so they are the ones
+    worth running without a `git` process. The other operations, e.g. the clone or the merges,
+    always use the `git` binary through `GitUtils`.
+    - "subprocess" runs the `git` binary, like `GitUtils`,
+    - "dulwich" reads and writes the objects, refs and index in process with the Dulwich library.
+    """
+    LIBRARIES = ("subprocess", "dulwich")
+
+    @staticmethod
+    def create(library: str) -> "GitBackend":
+        """
+        Create the backend of a library.
+
+        Parameters
+        ----------
+        library : str
+            The name of the library, "subprocess" or "dulwich".
+
+        Returns
+        -------
+        GitBackend
+            The backend.
+        """
+        if library not in GitBackend.LIBRARIES:
+            raise ValueError(f"Unsupported git library '{library}', expected one of {GitBackend.LIBRARIES}.")
+        return DulwichBackend() if library == "dulwich" else SubprocessBackend()
+
+    @abstractmethod
+    def config_user(self, local_path: str, user_email: str) -> None:
+        """
+        Configure the Git user name and email of the repository, see `GitUtils.config_user`.
+        """
+
+    @abstractmethod
+    def check_or_create_branch(self, local_path: str, branch_name: str) -> None:
+        """
+        Check out a branch, created from the checked out one if it does not exist, see `GitUtils.check_or_create_branch`.
+        """
+
+    @abstractmethod
+    def pull_branch(self, local_path: str, branch_name: str, depth: int = None) -> None:
+        """
+        Pull a branch into the checked out branch, see `GitUtils.pull_branch`.
+        """
+
+    @abstractmethod
+    def add_commit(self, local_path: str, commit_message: str, paths: list = None) -> bool:
+        """
+        Add and commit changes without pushing them, see `GitUtils.add_commit`.
+        """
+
+    @abstractmethod
+    def push_branch(self, local_path: str, branch_name: str) -> None:
+        """
+        Push a local branch to the remote repository, see `GitUtils.push_branch`.
+        """
+
+    def add_commit_push(self, local_path: str, commit_message: str, branch_name: str, paths: list = None) -> None:
+        """
+        Add, commit and push changes, see `GitUtils.add_commit_push`.
+        """
+        if self.add_commit(local_path=local_path, commit_message=commit_message, paths=paths):
+            self.push_branch(local_path=local_path, branch_name=branch_name)
+
+
+class SubprocessBackend(GitBackend):
+    """
+    The git operations run by the `git` binary, one process per command.
+    """
+
+    def config_user(self, local_path: str, user_email: str) -> None:
+        GitUtils.config_user(local_path=local_path, user_email=user_email)
+
+    def check_or_create_branch(self, local_path: str, branch_name: str) -> None:
+        GitUtils.check_or_create_branch(local_path=local_path, branch_name=branch_name)
+
+    def pull_branch(self, local_path: str, branch_name: str, depth: int = None) -> None:
+        GitUtils.pull_branch(local_path=local_path, branch_name=branch_name, depth=depth)
+
+    def add_commit(self, local_path: str, commit_message: str, paths: list = None) -> bool:
+        return GitUtils.add_commit(local_path=local_path, commit_message=commit_message, paths=paths)
+
+    def push_branch(self, local_path: str, branch_name: str) -> None:
+        GitUtils.push_branch(local_path=local_path, branch_name=branch_name)
+
+    def add_commit_push(self, local_path: str, commit_message: str, branch_name: str, paths: list = None) -> None:
+        GitUtils.add_commit_push(local_path=local_path, commit_message=commit_message, branch_name=branch_name, paths=paths)
+
+
+class DulwichBackend(GitBackend):
+    """
+    The git operations run in process by Dulwich, without spawning any process nor parsing any output.
+    The repository is read from a full clone, without the split index nor the sparse checkout
+    whose index extensions Dulwich does not read. The remote is fetched and pushed over the same
+    transports as git, e.g. a local path or HTTPS with the token of the remote URL.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor of the DulwichBackend class.
+        Dulwich is an optional dependency, only imported when this backend is used.
+        """
+        try:
+            from dulwich import porcelain
+            from dulwich.repo import Repo
+        except ImportError as e:
+            raise ImportError("The dulwich git library is not installed, install the 'dulwich' extra e.g. `uv sync --extra dulwich`.") from e
+        self.porcelain = porcelain
+        self.Repo = Repo
+
+    def config_user(self, local_path: str, user_email: str) -> None:
+        with tracer.span("dulwich config"), self.Repo(str(local_path)) as repo:
+            logger.info("Configuring Git user...")
+            config = repo.get_config()
+            config.set((b"user",), b"name", GitUtils.USER_NAME.encode())
+            config.set((b"user",), b"email", user_email.encode())
+            config.write_to_path()
+
+    def check_or_create_branch(self, local_path: str, branch_name: str) -> None:
+        with tracer.span("dulwich checkout", branch=branch_name), self.Repo(str(local_path)) as repo:
+            logger.info(f"Checking if branch '{branch_name}' exists...")
+            ref = f"refs/heads/{branch_name}".encode()
+            if ref in repo.refs:
+                logger.info(f"Branch '{branch_name}' already exists.")
+            else:
+                logger.info(f"Branch '{branch_name}' does not exist. Creating it...")
+                repo.refs[ref] = repo.head()
+            switched = repo.refs[ref] != repo.head()
+            repo.refs.set_symbolic_ref(b"HEAD", ref)
+            if switched:
+                # The index and the working tree only change when the branches point to different commits
+                self.porcelain.reset(repo, "hard", ref)
+            logger.info(f"Working in branch '{branch_name}'.")
+
+    def pull_branch(self, local_path: str, branch_name: str, depth: int = None) -> None:
+        with tracer.span("dulwich pull", branch=branch_name), self.Repo(str(local_path)) as repo:
+            logger.info(f"Pulling changes from branch '{branch_name}'...")
+            # Only fast-forwards, like the pulls of the workflow which never have local commits
+            self.porcelain.pull(repo, "origin", [f"refs/heads/{branch_name}".encode()], outstream=io.BytesIO(), errstream=io.BytesIO())
+
+    def add_commit(self, local_path: str, commit_message: str, paths: list = None) -> bool:
+        with tracer.span("dulwich commit", paths=len(paths) if paths else None), self.Repo(str(local_path)) as repo:
+            logger.info("Adding files...")
+            if paths:
+                repo.stage([Path(os.path.relpath(path, local_path)).as_posix() for path in paths])
+            else:
+                # Without paths, some versions add the working directory of the process instead of the repository
+                self.porcelain.add(repo, paths=[str(Path(local_path).resolve())])
+
+            logger.info("Checking for changes to commit...")
+            # The tree of the index is written once and compared to the tree of the last commit
+            tree = repo.open_index().commit(repo.object_store)
+            if tree == repo[repo.head()].tree:
+                logger.info("No changes to commit.")
+                return False
+
+            logger.info(f"Creating commit with message: {commit_message}")
+            # Match `git commit -m` which stores the message with a trailing newline
+            repo.do_commit((commit_message.rstrip() + "\n").encode())
+            return True
+
+    def push_branch(self, local_path: str, branch_name: str) -> None:
+        with tracer.span("dulwich push", branch=branch_name), self.Repo(str(local_path)) as repo:
+            logger.info("Pushing...")
+            ref = f"refs/heads/{branch_name}".encode()
+            self.porcelain.push(repo, "origin", [ref], outstream=io.BytesIO(), errstream=io.BytesIO())
+            # Like `git push`, the remote-tracking branch follows the pushed one
+            repo.refs[f"refs/remotes/origin/{branch_name}".encode()] = repo.refs[ref]
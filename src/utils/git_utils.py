@@ -1,11 +1,21 @@
 import os
-import requests
+import re
+import time
 import subprocess
 from loguru import logger 
+from datetime import datetime
+from typing import Iterable
+from urllib.parse import urlsplit
+from utils.github_client import GitHubClient
+from utils.tracing import tracer
 
 class GitUtils:
+    USER_NAME = "Super-dev"
+    # Global options of git followed by a separate value, e.g. "git -c key=value commit"
+    GLOBAL_OPTIONS_WITH_VALUE = ("-c", "-C", "--git-dir", "--work-tree", "--namespace", "--config-env")
+
     @staticmethod
-    def run_command(command, cwd: str=None) -> str:
+    def run_command(command, cwd: str=None, log_errors: bool=True) -> str:
         """
         Execute a shell command and return the output if required.
         
@@ -15,32 +25,95 @@ class GitUtils:
             The command to execute.
         cwd : str
             The current working directory.
+        log_errors : bool
+            Log a failure of the command, False when the caller expects it and handles it.
             
         Returns
         -------
         str
             The output of the command.  
         """
-        try:
-            result = subprocess.run(command, cwd=cwd, text=True, capture_output=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error while executing command: {e.cmd} (return code: {e.returncode}): {e.stderr}")
-            raise
+        with tracer.span(GitUtils.span_name(command), command=GitUtils.redact(command), cwd=str(cwd) if cwd else None) as span:
+            try:
+                result = subprocess.run(command, cwd=cwd, text=True, capture_output=True, check=True)
+                span.set(exit_code=result.returncode, stdout_bytes=len(result.stdout.encode()), stderr_bytes=len(result.stderr.encode()))
+                return result.stdout
+            except subprocess.CalledProcessError as e:
+                span.set(exit_code=e.returncode, stdout_bytes=len((e.stdout or "").encode()), stderr_bytes=len((e.stderr or "").encode()))
+                if log_errors:
+                    logger.error(f"Error while executing command: {e.cmd} (return code: {e.returncode}): {e.stderr}")
+                raise
+
+    @staticmethod
+    def span_name(command) -> str:
+        """
+        Get the name of the span of a command, its subcommand for git so that the spans of a same
+        operation are summed up together whichever global options are given.
+        
+        Parameters
+        ----------
+        command : list
+            The command.
+            
+        Returns
+        -------
+        str
+            The name e.g. "git fetch" for "git -c fetch.unpackLimit=1 fetch --quiet".
+        """
+        parts = [str(part) for part in command]
+        if not parts or parts[0] != "git":
+            return " ".join(parts[:2])
+        index = 1
+        while index < len(parts) and parts[index].startswith("-"):
+            index += 2 if parts[index] in GitUtils.GLOBAL_OPTIONS_WITH_VALUE else 1
+        return " ".join(parts[:1] + parts[index:index + 1])
 
     @staticmethod
-    def clone_repository(repository_url: str, local_path: str, github_access_token: str) -> None:
+    def redact(command) -> str:
+        """
+        Get a command as a string with the credentials of its URLs hidden, to be logged or traced.
+        
+        Parameters
+        ----------
+        command : list
+            The command.
+            
+        Returns
+        -------
+        str
+            The command, e.g. "git clone https://***@github.com/owner/name.git data".
+        """
+        return re.sub(r"://[^/@\s]+@", "://***@", " ".join(str(part) for part in command))
+
+    @staticmethod
+    def clone_repository(
+            repository_url: str, 
+            local_path: str, 
+            github_access_token: str,
+            depth: int = None,
+            filter_blobs: bool = False,
+            sparse_paths: list = None,
+            reference: str = None
+        ) -> None:
         """
         Clone a Git repository with authentication.
         
         Parameters
         ----------
         repository_url : str
-            The URL of the Git repository.
+            The URL of the Git repository, HTTPS or file:// for a local repository.
         local_path : str
             The local path where the repository will be cloned.
         github_access_token : str
             The personal access token for authentication.
+        depth : int
+            Create a shallow clone with a history truncated to this number of commits.
+        filter_blobs : bool
+            Create a blobless clone, file contents are only downloaded when checked out.
+        sparse_paths : list
+            Only check out these paths, relative to the repository root.
+        reference : str
+            The path of a local repository to borrow objects from, only the missing ones are downloaded.
         
         Returns
         -------
@@ -50,23 +123,103 @@ class GitUtils:
             logger.info(f"Repository already exists at {local_path}. Skipping clone.")
             return
 
-        # Inject the token into the repository URL
-        if repository_url.startswith("https://"):
-            auth_repo_url = repository_url.replace("https://", f"https://{github_access_token}@")
-        else:
-            raise ValueError("Unsupported repository URL format. Only HTTPS is supported.")
-
+        auth_repo_url = GitUtils.authenticated_url(repository_url, github_access_token)
+        command = ["git", "clone"]
+        if reference:
+            command += ["--reference", str(reference)]
+        if depth:
+            command += ["--depth", str(depth)]
+        if filter_blobs:
+            command += ["--filter=blob:none"]
+        if sparse_paths:
+            command += ["--no-checkout"]
+        
         try:
             logger.info(f"Cloning repository {repository_url} into {local_path}...")
-            GitUtils.run_command(["git", "clone", auth_repo_url, local_path])
+            GitUtils.run_command(command + [auth_repo_url, str(local_path)])
+            if sparse_paths:
+                logger.info(f"Checking out only {', '.join(sparse_paths)}...")
+                patterns = [f"/{path.lstrip('/')}" for path in sparse_paths]
+                GitUtils.run_command(["git", "sparse-checkout", "set", "--no-cone"] + patterns, cwd=local_path)
+                GitUtils.run_command(["git", "reset", "--hard", "--quiet"], cwd=local_path)
         except subprocess.CalledProcessError as e:
             logger.error(f"Error while cloning the repository: {e}.")
             raise
         
+    @staticmethod
+    def authenticated_url(repository_url: str, github_access_token: str) -> str:
+        """
+        Inject the token into a repository URL.
+        
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the Git repository, HTTPS or file:// for a local repository.
+        github_access_token : str
+            The personal access token for authentication.
+            
+        Returns
+        -------
+        str
+            The URL to fetch from and push to.
+        """
+        if repository_url.startswith("https://"):
+            return repository_url.replace("https://", f"https://{github_access_token}@")
+        if repository_url.startswith("file://"):
+            # Local repositories, e.g. the origin of the benchmarks, need no authentication
+            return repository_url
+        raise ValueError("Unsupported repository URL format. Only HTTPS and file:// are supported.")
+
+    @staticmethod
+    def repository_slug(repository_url: str) -> str:
+        """
+        Get a file name identifying a repository, to cache it.
+        
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the Git repository, without credentials.
+            
+        Returns
+        -------
+        str
+            The host and path of the repository e.g. "github.com_owner_name".
+        """
+        url = urlsplit(repository_url)
+        return re.sub(r"[^A-Za-z0-9._-]+", "_", f"{url.hostname or ''}{url.path}".strip("/")).removesuffix(".git")
+
+    @staticmethod
+    def fetch_repository(local_path: str, repository_url: str, github_access_token: str) -> None:
+        """
+        Bring an existing clone up to date: point it to the repository with the current token
+        and fetch the branches, only the commits missing from the clone are downloaded.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        repository_url : str
+            The URL of the Git repository, HTTPS or file:// for a local repository.
+        github_access_token : str
+            The personal access token for authentication.
+            
+        Returns
+        -------
+        None
+        """
+        try:
+            logger.info(f"Fetching {repository_url} into the existing clone...")
+            GitUtils.run_command(["git", "remote", "set-url", "origin", GitUtils.authenticated_url(repository_url, github_access_token)], cwd=local_path)
+            GitUtils.run_command(["git", "fetch", "--quiet", "--prune", "origin"], cwd=local_path)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while fetching the repository: {e}.")
+            raise
+
     @staticmethod
     def config_user(local_path: str, user_email: str) -> None:
         """
-        Configure the Git user name and email.
+        Configure the Git user name and email of the repository.
+        The configuration is local to the repository so that concurrent workflows do not overwrite each other.
         
         Parameters
         ----------
@@ -81,8 +234,8 @@ class GitUtils:
         """
         try:
             logger.info("Configuring Git user...")
-            GitUtils.run_command(["git", "config", "--global", "user.name", "Super-dev"], cwd=local_path)
-            GitUtils.run_command(["git", "config", "--global", "user.email", user_email], cwd=local_path)
+            GitUtils.run_command(["git", "config", "user.name", GitUtils.USER_NAME], cwd=local_path)
+            GitUtils.run_command(["git", "config", "user.email", user_email], cwd=local_path)
         except subprocess.CalledProcessError as e:
             logger.error(f"Error while configuring Git user: {e}.")
             raise
@@ -121,9 +274,9 @@ class GitUtils:
             raise 
         
     @staticmethod
-    def pull_branch(local_path: str, branch_name: str) -> None:
+    def pull_branch(local_path: str, branch_name: str, depth: int = None) -> None:
         """
-        Pull the latest changes from a branch.
+        Pull the latest changes from a branch into the checked out branch.
         
         Parameters
         ----------
@@ -131,6 +284,9 @@ class GitUtils:
             The local path of the repository.
         branch_name : str
             The name of the branch to pull from.
+        depth : int
+            For shallow clones, the number of commits to fetch. The checked out branch is then
+            reset to the fetched one because a merge could miss the history of their common base.
         
         Returns
         -------
@@ -138,14 +294,115 @@ class GitUtils:
         """
         try:
             logger.info(f"Pulling latest changes from branch '{branch_name}'...")
-            GitUtils.run_command(["git", "pull", "origin", branch_name], cwd=local_path)
+            if depth:
+                GitUtils.run_command(["git", "fetch", "--depth", str(depth), "origin", branch_name], cwd=local_path)
+                GitUtils.run_command(["git", "reset", "--hard", "--quiet", "FETCH_HEAD"], cwd=local_path)
+            else:
+                GitUtils.run_command(["git", "pull", "origin", branch_name], cwd=local_path)
             logger.info(f"Latest changes pulled from branch '{branch_name}'.")
         except subprocess.CalledProcessError as e:
             logger.error(f"Error while pulling branch: {e}")
             raise    
         
     @staticmethod
-    def add_commit_push(local_path: str, commit_message: str, branch_name: str) -> None:
+    def fetch_branch(local_path: str, branch_name: str) -> bool:
+        """
+        Fetch a branch of the remote repository into its remote-tracking branch e.g. "origin/feat/my-feature",
+        whatever the branches the clone follows.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        branch_name : str
+            The name of the branch.
+        
+        Returns
+        -------
+        bool
+            True if the branch was fetched, False if it does not exist in the remote repository.
+        """
+        try:
+            if not GitUtils.run_command(["git", "ls-remote", "--heads", "origin", branch_name], cwd=local_path).strip():
+                return False
+            logger.info(f"Fetching branch '{branch_name}'...")
+            GitUtils.run_command(["git", "fetch", "--quiet", "origin", f"+refs/heads/{branch_name}:refs/remotes/origin/{branch_name}"], cwd=local_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while fetching branch: {e}")
+            raise
+
+    @staticmethod
+    def reset_branch(local_path: str, branch_name: str, start_point: str) -> None:
+        """
+        Check out a branch reset to a commit, local commits and changes are dropped.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        branch_name : str
+            The name of the branch, created if needed.
+        start_point : str
+            The commit the branch is reset to e.g. "origin/feat/my-feature".
+        
+        Returns
+        -------
+        None
+        """
+        try:
+            logger.info(f"Resetting branch '{branch_name}' to {start_point}...")
+            GitUtils.run_command(["git", "checkout", "--quiet", "--force", "-B", branch_name, start_point], cwd=local_path)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while resetting branch: {e}")
+            raise
+
+    @staticmethod
+    def discard_changes(local_path: str) -> None:
+        """
+        Discard the uncommitted changes of the working tree, e.g. left by a failed run.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        
+        Returns
+        -------
+        None
+        """
+        try:
+            logger.info("Discarding the uncommitted changes...")
+            GitUtils.run_command(["git", "reset", "--quiet", "--hard"], cwd=local_path)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while discarding changes: {e}")
+            raise
+
+    @staticmethod
+    def commit_subjects(local_path: str, revision_range: str) -> list:
+        """
+        List the subjects of the commits of a range.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        revision_range : str
+            The range of commits e.g. "develop..origin/feat/my-feature".
+        
+        Returns
+        -------
+        list
+            The subjects of the commits, oldest first.
+        """
+        try:
+            return GitUtils.run_command(["git", "log", "--reverse", "--format=%s", revision_range], cwd=local_path).splitlines()
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while listing commits: {e}")
+            raise
+
+    @staticmethod
+    def add_commit_push(local_path: str, commit_message: str, branch_name: str, paths: list = None) -> None:
         """
         Add, commit and push changes to the local repository.
         
@@ -157,11 +414,39 @@ class GitUtils:
             The commit message.
         branch_name : str
             The name of the branch to push to.
+        paths : list
+            Only stage and check these paths, see `add_commit`.
             
         Returns
         -------
         None
         """
+        if GitUtils.add_commit(local_path=local_path, commit_message=commit_message, paths=paths):
+            GitUtils.push_branch(local_path=local_path, branch_name=branch_name)
+
+    @staticmethod
+    def add_commit(local_path: str, commit_message: str, paths: list = None) -> bool:
+        """
+        Add and commit changes to the local repository without pushing them.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        commit_message : str
+            The commit message.
+        paths : list
+            Only stage and check these paths, absolute or relative to the repository, deleted ones
+            are removed from the index. The rest of the working tree is neither scanned nor refreshed
+            and the commit is written from the index, so its cost does not grow with the repository.
+
+        Returns
+        -------
+        bool
+            True if a commit was created, False if there was nothing to commit.
+        """
+        if paths:
+            return GitUtils.__commit_paths(local_path=local_path, commit_message=commit_message, paths=paths)
         try:
             logger.info("Adding files...")
             GitUtils.run_command(["git", "add", "."], cwd=local_path)
@@ -170,17 +455,198 @@ class GitUtils:
             status_output = GitUtils.run_command(["git", "status", "--porcelain"], cwd=local_path)
             if not status_output.strip():
                 logger.info("No changes to commit.")
-                return
+                return False
 
             logger.info(f"Creating commit with message: {commit_message}")
             GitUtils.run_command(["git", "commit", "-m", commit_message], cwd=local_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while committing: {e}")
+            raise
+
+    @staticmethod
+    def __commit_paths(local_path: str, commit_message: str, paths: list) -> bool:
+        """
+        Stage some paths and commit the index with plumbing commands, which unlike `git add .`,
+        `git status` and `git commit` do not look at every file of the working tree.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        commit_message : str
+            The commit message.
+        paths : list
+            The paths to stage.
+
+        Returns
+        -------
+        bool
+            True if a commit was created, False if there was nothing to commit.
+        """
+        try:
+            logger.info(f"Adding {', '.join(str(path) for path in paths)}...")
+            GitUtils.run_command(["git", "update-index", "--add", "--remove", "--"] + [str(path) for path in paths], cwd=local_path)
+
+            logger.info("Checking for changes to commit...")
+            # Unchanged directories are cached in the index, only the tree of the staged paths is written
+            tree = GitUtils.run_command(["git", "write-tree"], cwd=local_path).strip()
+            parent, parent_tree = GitUtils.run_command(["git", "rev-parse", "HEAD", "HEAD^{tree}"], cwd=local_path).split()
+            if tree == parent_tree:
+                logger.info("No changes to commit.")
+                return False
+
+            logger.info(f"Creating commit with message: {commit_message}")
+            commit = GitUtils.run_command(["git", "commit-tree", tree, "-p", parent, "-m", commit_message], cwd=local_path).strip()
+            GitUtils.run_command(["git", "update-ref", "-m", f"commit: {commit_message}", "HEAD", commit, parent], cwd=local_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while committing: {e}")
+            raise
 
+    @staticmethod
+    def enable_index_caches(local_path: str) -> None:
+        """
+        Speed up the commands reading the working tree of a large repository: the untracked cache
+        remembers the directories without new files, the split index only rewrites the changed
+        entries, and the file system monitor reports the changed files when git is built with it.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+
+        Returns
+        -------
+        None
+        """
+        try:
+            logger.info("Enabling the index caches...")
+            GitUtils.run_command(["git", "config", "core.untrackedCache", "true"], cwd=local_path)
+            GitUtils.run_command(["git", "config", "core.splitIndex", "true"], cwd=local_path)
+            if "fsmonitor--daemon" in GitUtils.run_command(["git", "version", "--build-options"]):
+                GitUtils.run_command(["git", "config", "core.fsmonitor", "true"], cwd=local_path)
+            else:
+                logger.info("This git build has no file system monitor, continuing without it.")
+            # The index is rewritten in its new format right away instead of by the first commit
+            GitUtils.run_command(["git", "update-index", "--split-index", "--untracked-cache"], cwd=local_path)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while enabling the index caches: {e}")
+            raise
+
+    @staticmethod
+    def push_branch(local_path: str, branch_name: str) -> None:
+        """
+        Push a local branch and all its pending commits to the remote repository.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        branch_name : str
+            The name of the branch to push to.
+
+        Returns
+        -------
+        None
+        """
+        try:
             logger.info("Pushing...")
             GitUtils.run_command(["git", "push", "--set-upstream", "origin", branch_name], cwd=local_path)
         except subprocess.CalledProcessError as e:
-            logger.error(f"Error while committing or pushing: {e}")
+            logger.error(f"Error while pushing: {e}")
             raise
+
+    @staticmethod
+    def fast_import_commits(
+            local_path: str, 
+            branch_name: str, 
+            file_name: str, 
+            commits: Iterable[tuple[str, str | dict, datetime | None]], 
+            author_email: str
+        ) -> int:
+        """
+        Create a series of commits on a branch by streaming them to a single `git fast-import` process.
+        Each commit replaces the content of one file, or of several files, the working tree is updated
+        at the end if the branch is checked out. Nothing is pushed.
+        
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        branch_name : str
+            The name of the branch to commit to, it must already exist.
+        file_name : str
+            The path of the file relative to the repository root.
+        commits : Iterable[tuple[str, str | dict, datetime | None]]
+            The commits to create in order, as (commit message, full file content, date) tuples.
+            The content can also be a dict of contents by path, a None content deleting the file.
+            A None date means now, the date is used for both the author and the committer.
+        author_email : str
+            The email of the author and committer.
+            
+        Returns
+        -------
+        int
+            The number of commits created.
+        """
+        ref = f"refs/heads/{branch_name}"
+        parent = GitUtils.run_command(["git", "rev-parse", "--verify", ref], cwd=local_path).strip()
+        command = ["git", "fast-import", "--quiet", "--done", "--date-format=raw"]
         
+        logger.info(f"Streaming commits to {branch_name} with git fast-import...")
+        with tracer.span("git fast-import", command=GitUtils.redact(command), cwd=str(local_path)) as span:
+            process = subprocess.Popen(command, cwd=local_path, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            number_of_commits = 0
+            written = 0
+            try:
+                for commit_message, content, date in commits:
+                    date = (date or datetime.now()).astimezone()
+                    offset = date.strftime("%z")
+                    identity = f"{GitUtils.USER_NAME} <{author_email}> {int(date.timestamp())} {offset}".encode()
+                    # Match `git commit -m` which stores the message with a trailing newline
+                    message = commit_message.rstrip().encode() + b"\n"
+                
+                    chunks = [
+                        f"commit {ref}\n".encode(),
+                        b"author " + identity + b"\n",
+                        b"committer " + identity + b"\n",
+                        f"data {len(message)}\n".encode(), message,
+                    ]
+                    if number_of_commits == 0:
+                        chunks.append(f"from {parent}\n".encode())
+                    for path, data in (content.items() if isinstance(content, dict) else [(file_name, content)]):
+                        if data is None:
+                            chunks.append(f"D {path}\n".encode())
+                        else:
+                            data = data.encode()
+                            chunks += [f"M 100644 inline {path}\n".encode(), f"data {len(data)}\n".encode(), data, b"\n"]
+                    chunks.append(b"\n")
+                    written += process.stdin.write(b"".join(chunks))
+                    number_of_commits += 1
+                process.stdin.write(b"done\n")
+                process.stdin.close()
+            except BrokenPipeError:
+                # fast-import stopped early, its error message is read below
+                pass
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+            stderr = process.stderr.read().decode()
+            process.stderr.close()
+            span.set(exit_code=process.wait(), commits=number_of_commits, stdin_bytes=written, stderr_bytes=len(stderr.encode()))
+            if process.returncode != 0:
+                logger.error(f"Error while executing command: {command} (return code: {process.returncode}): {stderr}")
+                raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+        
+        # Bring the index and the working tree up to date if the branch is checked out
+        head = GitUtils.run_command(["git", "rev-parse", "--symbolic-full-name", "HEAD"], cwd=local_path).strip()
+        if head == ref and number_of_commits:
+            GitUtils.run_command(["git", "read-tree", "-u", "-m", parent, ref], cwd=local_path)
+        logger.info(f"{number_of_commits} commits created on {branch_name} with git fast-import.")
+        return number_of_commits
+
     @staticmethod
     def create_pull_request(
             repo_owner:str, 
@@ -189,7 +655,9 @@ class GitUtils:
             target_branch:str, 
             title:str, 
             body:str, 
-            github_access_token:str
+            github_access_token:str,
+            labels:tuple=("skip-ci",),
+            client:GitHubClient=None
         ) -> dict:
         """
         Create a pull request on GitHub.
@@ -210,17 +678,17 @@ class GitUtils:
             The body/description of the pull request.
         github_access_token : str
             The GitHub Personal Access Token for authentication.
+        labels : tuple
+            The labels added to the pull request, "skip-ci" avoids triggering the CI/CD.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
 
         Returns
         -------
         dict
             The response from the GitHub API.
         """
-        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls"
-        headers = {
-            "Authorization": f"Bearer {github_access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        client = client or GitHubClient.shared(github_access_token)
         data = {
             "title": title,
             "head": source_branch,
@@ -228,28 +696,161 @@ class GitUtils:
             "body": body
         }
 
-        response = requests.post(url, headers=headers, json=data)
-        if response.status_code == 201:
+        # GitHub refuses a second open pull request between the same branches, so a retry can not create a duplicate
+        response = client.request("POST", f"/repos/{repo_owner}/{repo_name}/pulls", json=data, idempotent=True)
+        pr = None
+        if response.status_code == 422 and "already exists" in response.text:
+            # The pull request was created by an attempt whose response was lost
+            pulls = client.request(
+                "GET", 
+                f"/repos/{repo_owner}/{repo_name}/pulls", 
+                params={"head": f"{repo_owner}:{source_branch}", "base": target_branch, "state": "open"}
+            )
+            if pulls.status_code == 200 and pulls.json():
+                pr = pulls.json()[0]
+                logger.info(f"Pull request already exists: {pr.get('html_url')}")
+        elif response.status_code == 201:
             pr = response.json()
-            pr_number = pr["number"]
+            logger.info(f"Pull request created successfully: {pr.get('html_url')}")
+        if pr is None:
+            logger.error(f"Failed to create pull request: {response.status_code} - {response.text}")
+            response.raise_for_status()
+        # The attempt whose response was lost may have failed before labeling, adding a label again is harmless
+        if labels:
+            GitUtils.add_labels(
+                repo_owner=repo_owner, 
+                repo_name=repo_name, 
+                issue_number=pr["number"], 
+                labels=list(labels), 
+                github_access_token=github_access_token, 
+                client=client
+            )
+        return pr
+            
+    @staticmethod
+    def add_labels(
+            repo_owner: str, 
+            repo_name: str, 
+            issue_number: int, 
+            labels: list, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> None:
+        """
+        Add labels to a pull request or an issue on GitHub.
 
-            # Add a label to the PR
-            label_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues/{pr_number}/labels"
-            label_data = {"labels": ["skip-ci"]}
-            requests.post(label_url, headers=headers, json=label_data)
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        issue_number : int
+            The number of the pull request or issue.
+        labels : list
+            The labels to add.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
 
-            logger.info(f"Pull request created successfully: {pr.get('html_url')}")
-            return pr
+        Returns
+        -------
+        None
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        url = f"/repos/{repo_owner}/{repo_name}/issues/{issue_number}/labels"
+        # Adding labels already added changes nothing
+        response = client.request("POST", url, json={"labels": labels}, idempotent=True)
+        if response.status_code == 200:
+            logger.info(f"Labels {labels} added to #{issue_number}.")
         else:
-            logger.error(f"Failed to create pull request: {response.status_code} - {response.text}")
+            logger.error(f"Failed to add labels to #{issue_number}: {response.status_code} - {response.text}")
             response.raise_for_status()
+
+    @staticmethod
+    def wait_for_mergeable(
+            repo_owner: str, 
+            repo_name: str, 
+            pull_number: int, 
+            github_access_token: str,
+            timeout: float = 60.0,
+            initial_delay: float = 0.25,
+            max_delay: float = 4.0,
+            client: GitHubClient = None
+        ) -> dict:
+        """
+        Wait until GitHub reports a pull request as mergeable.
+        The pull request is polled with conditional requests, an unchanged pull request answers
+        304 Not Modified which does not count against the rate limit, and the delay between
+        two polls grows exponentially.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        pull_number : int
+            The number of the pull request.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        timeout : float
+            The longest time to wait, in seconds.
+        initial_delay : float
+            The delay between the first two polls, in seconds.
+        max_delay : float
+            The longest delay between two polls, in seconds.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        dict
+            The pull request from the GitHub API, returned right away if it is already merged.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        url = f"/repos/{repo_owner}/{repo_name}/pulls/{pull_number}"
+        start = time.monotonic()
+        delay = initial_delay
+        etag = None
+        pr = None
+        polls = 0
+        
+        with tracer.span("wait for mergeable", pull_number=pull_number) as span:
+            while True:
+                response = client.request("GET", url, headers={"If-None-Match": etag} if etag else {})
+                polls += 1
+                span.set(polls=polls)
+                if response.status_code == 200:
+                    pr = response.json()
+                    etag = response.headers.get("ETag")
+                elif response.status_code != 304:
+                    logger.error(f"Failed to get pull request #{pull_number}: {response.status_code} - {response.text}")
+                    response.raise_for_status()
             
+                waited = time.monotonic() - start
+                if pr.get("merged"):
+                    logger.info(f"Pull request #{pull_number} is already merged.")
+                    return pr
+                if pr["mergeable"]:
+                    logger.info(f"Pull request #{pull_number} is mergeable after {waited:.2f}s and {polls} polls.")
+                    return pr
+                if pr["mergeable"] is False or pr["state"] != "open":
+                    raise RuntimeError(f"Pull request #{pull_number} cannot be merged (state: {pr['state']}, mergeable state: {pr.get('mergeable_state')}).")
+                if waited >= timeout:
+                    raise TimeoutError(f"Pull request #{pull_number} is still not mergeable after {waited:.2f}s and {polls} polls.")
+            
+                time.sleep(min(delay, timeout - waited))
+                delay = min(delay * 2, max_delay)
+
     @staticmethod
     def merge_pull_request(
             repo_owner: str, 
             repo_name: str, 
             pull_number: int, 
-            github_access_token: str
+            github_access_token: str,
+            client: GitHubClient = None
         ) -> dict:
         """
         Merge a pull request on GitHub.
@@ -264,30 +865,141 @@ class GitUtils:
             The number of the pull request to merge.
         github_access_token : str
             The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
 
         Returns
         -------
         dict
             The response from the GitHub API.
         """
-        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/pulls/{pull_number}/merge"
-        headers = {
-            "Authorization": f"Bearer {github_access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        client = client or GitHubClient.shared(github_access_token)
         data = {
             "commit_title": f"Merge PR #{pull_number}",
             "merge_method": "merge" 
         }
 
-        response = requests.put(url, headers=headers, json=data)
+        response = client.request("PUT", f"/repos/{repo_owner}/{repo_name}/pulls/{pull_number}/merge", json=data)
         if response.status_code == 200:
-            logger.info(f"Pull request merged successfully: {response.json()}")
-            return response.json()
+            merge = response.json()
+            logger.info(f"Pull request #{pull_number} merged successfully: {merge.get('sha')}.")
+            return merge
         else:
             logger.error(f"Failed to merge pull request: {response.status_code} - {response.text}")
             response.raise_for_status()
             
+    @staticmethod
+    def merge_branch(
+            repo_owner: str, 
+            repo_name: str, 
+            base_branch: str, 
+            head: str, 
+            commit_message: str, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> bool:
+        """
+        Merge a branch or a commit into a branch on GitHub, without a pull request.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        base_branch : str
+            The branch to merge into (e.g., "develop").
+        head : str
+            The branch or the SHA of the commit to merge (e.g., "feat/my-feature").
+        commit_message : str
+            The message of the merge commit.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        bool
+            True if merged or already merged, False if GitHub refused the merge, e.g. because
+            a protection of the branch requires a pull request, in which case nothing changed.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        data = {"base": base_branch, "head": head, "commit_message": commit_message}
+        # A conflict is a merge conflict or a protected branch here, retrying it would not help
+        retry_status_codes = tuple(code for code in client.RETRY_STATUS_CODES if code != 409)
+        # A merge already done is answered with a 204
+        response = client.request("POST", f"/repos/{repo_owner}/{repo_name}/merges", json=data, retry_status_codes=retry_status_codes, idempotent=True)
+        if response.status_code == 201:
+            logger.info(f"{head} merged into {base_branch}: {response.json()['sha']}.")
+            return True
+        elif response.status_code == 204:
+            logger.info(f"{head} is already merged into {base_branch}.")
+            return True
+        elif response.status_code in (403, 409, 422):
+            logger.warning(f"GitHub refused to merge {head} into {base_branch}: {response.status_code} - {response.text}")
+            return False
+        else:
+            logger.error(f"Failed to merge {head} into {base_branch}: {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def merge_commit(local_path: str, base: str, head: str, commit_message: str) -> str:
+        """
+        Create the commit merging two commits, like the merge of a pull request, without checking it out.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        base : str
+            The commit merged into e.g. "origin/develop", first parent of the merge.
+        head : str
+            The commit to merge e.g. "feat/my-feature".
+        commit_message : str
+            The message of the merge commit.
+
+        Returns
+        -------
+        str
+            The SHA of the merge commit.
+        """
+        try:
+            logger.info(f"Merging {head} into {base}...")
+            # The first line of the output is the merged tree, a conflict fails the command
+            tree = GitUtils.run_command(["git", "merge-tree", "--write-tree", base, head], cwd=local_path).split()[0]
+            return GitUtils.run_command(["git", "commit-tree", tree, "-p", base, "-p", head, "-m", commit_message], cwd=local_path).strip()
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error while merging: {e}")
+            raise
+
+    @staticmethod
+    def push_commits(local_path: str, commits: dict) -> bool:
+        """
+        Point remote branches to commits in a single atomic push: every branch is updated or none.
+        Branches are only fast-forwarded, like any push without force.
+
+        Parameters
+        ----------
+        local_path : str
+            The local path of the repository.
+        commits : dict
+            The SHA of the commit by branch name.
+
+        Returns
+        -------
+        bool
+            True if pushed, False if the remote refused it, e.g. a protected branch
+            or a branch updated meanwhile, in which case no branch changed.
+        """
+        try:
+            logger.info(f"Pushing {', '.join(commits)} at once...")
+            GitUtils.run_command(["git", "push", "--atomic", "origin"] + [f"{sha}:refs/heads/{branch}" for branch, sha in commits.items()], cwd=local_path, log_errors=False)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"The push of {', '.join(commits)} was refused: {e.stderr.strip()}")
+            return False
+
     @staticmethod
     def delete_branch(local_path: str, branch_name: str) -> None:
         """
@@ -317,7 +1029,8 @@ class GitUtils:
             repo_owner: str, 
             repo_name: str, 
             branch_name: str, 
-            github_access_token: str
+            github_access_token: str,
+            client: GitHubClient = None
         ) -> None:
         """
         Delete a remote branch from a GitHub repository.
@@ -332,22 +1045,311 @@ class GitUtils:
             The name of the branch to delete (e.g., "feat/my-feature").
         github_access_token : str
             The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
 
         Returns
         -------
         None
         """
-        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/git/refs/heads/{branch_name}"
-        headers = {
-            "Authorization": f"Bearer {github_access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-
-        response = requests.delete(url, headers=headers)
+        client = client or GitHubClient.shared(github_access_token)
+        response = client.request("DELETE", f"/repos/{repo_owner}/{repo_name}/git/refs/heads/{branch_name}")
         if response.status_code == 204:
             logger.info(f"Branch '{branch_name}' deleted successfully from remote repository.")
         elif response.status_code == 404:
             logger.error(f"Branch '{branch_name}' not found in the repository.")
         else:
             logger.error(f"Failed to delete branch '{branch_name}': {response.status_code} - {response.text}")
-            response.raise_for_status()
\ No newline at end of file
+            response.raise_for_status()
+            
+    @staticmethod
+    def get_branch_sha(
+            repo_owner: str, 
+            repo_name: str, 
+            branch_name: str, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> str | None:
+        """
+        Get the SHA of the commit a branch points to on GitHub.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        branch_name : str
+            The name of the branch.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        str | None
+            The SHA of the commit, or None if the branch does not exist.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        response = client.request("GET", f"/repos/{repo_owner}/{repo_name}/git/ref/heads/{branch_name}")
+        if response.status_code == 200:
+            return response.json()["object"]["sha"]
+        elif response.status_code == 404:
+            return None
+        else:
+            logger.error(f"Failed to get branch '{branch_name}': {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def get_commit(
+            repo_owner: str, 
+            repo_name: str, 
+            commit_sha: str, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> dict:
+        """
+        Get a commit object from the GitHub Git Data API.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        commit_sha : str
+            The SHA of the commit.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        dict
+            The commit, with the SHA of its tree.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        response = client.request("GET", f"/repos/{repo_owner}/{repo_name}/git/commits/{commit_sha}")
+        if response.status_code == 200:
+            return response.json()
+        else:
+            logger.error(f"Failed to get commit {commit_sha}: {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def get_file_content(
+            repo_owner: str, 
+            repo_name: str, 
+            file_name: str, 
+            ref: str, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> str | None:
+        """
+        Get the content of a file at a given commit on GitHub.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        file_name : str
+            The path of the file relative to the repository root.
+        ref : str
+            The commit SHA or branch name.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        str | None
+            The content of the file, None if the file does not exist.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        response = client.request(
+            "GET", 
+            f"/repos/{repo_owner}/{repo_name}/contents/{file_name}", 
+            params={"ref": ref}, 
+            headers={"Accept": "application/vnd.github.raw+json"}
+        )
+        if response.status_code == 200:
+            return response.content.decode()
+        elif response.status_code == 404:
+            return None
+        else:
+            logger.error(f"Failed to get file '{file_name}': {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def create_tree(
+            repo_owner: str, 
+            repo_name: str, 
+            base_tree: str, 
+            files: dict, 
+            github_access_token: str,
+            client: GitHubClient = None
+        ) -> str:
+        """
+        Create a tree on GitHub from a base tree and the new content of some files.
+        File contents are sent inline, GitHub creates their blobs along with the tree.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        base_tree : str
+            The SHA of the tree to start from.
+        files : dict
+            The new content of each file by path, None deletes the file.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        str
+            The SHA of the new tree.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        entries = [
+            {"path": path, "mode": "100644", "type": "blob", "sha": None} if content is None 
+            else {"path": path, "mode": "100644", "type": "blob", "content": content} 
+            for path, content in files.items()
+        ]
+        # The SHA of a tree is its content, creating it twice gives the same tree
+        response = client.request("POST", f"/repos/{repo_owner}/{repo_name}/git/trees", json={"base_tree": base_tree, "tree": entries}, idempotent=True)
+        if response.status_code == 201:
+            return response.json()["sha"]
+        else:
+            logger.error(f"Failed to create tree: {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def create_commit(
+            repo_owner: str, 
+            repo_name: str, 
+            commit_message: str, 
+            tree: str, 
+            parents: list, 
+            author_email: str, 
+            github_access_token: str,
+            date: datetime = None,
+            client: GitHubClient = None
+        ) -> str:
+        """
+        Create a commit on GitHub without updating any branch.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        commit_message : str
+            The commit message.
+        tree : str
+            The SHA of the tree of the commit.
+        parents : list
+            The SHAs of the parent commits.
+        author_email : str
+            The email of the author and committer.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        date : datetime
+            The author and committer date, now by default.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        str
+            The SHA of the new commit.
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        identity = {"name": GitUtils.USER_NAME, "email": author_email}
+        if date:
+            identity["date"] = date.astimezone().isoformat(timespec="seconds")
+        data = {
+            # Match `git commit -m` which stores the message with a trailing newline
+            "message": commit_message.rstrip() + "\n",
+            "tree": tree,
+            "parents": parents,
+            "author": identity,
+            "committer": identity
+        }
+        # Dated by the caller, the commit is the same object when created twice, otherwise each attempt has its own date
+        response = client.request("POST", f"/repos/{repo_owner}/{repo_name}/git/commits", json=data, idempotent=date is not None)
+        if response.status_code == 201:
+            return response.json()["sha"]
+        else:
+            logger.error(f"Failed to create commit: {response.status_code} - {response.text}")
+            response.raise_for_status()
+
+    @staticmethod
+    def update_branch(
+            repo_owner: str, 
+            repo_name: str, 
+            branch_name: str, 
+            commit_sha: str, 
+            github_access_token: str,
+            create: bool = False,
+            force: bool = False,
+            client: GitHubClient = None
+        ) -> None:
+        """
+        Point a branch to a commit on GitHub.
+
+        Parameters
+        ----------
+        repo_owner : str
+            The owner of the repository.
+        repo_name : str
+            The name of the repository.
+        branch_name : str
+            The name of the branch.
+        commit_sha : str
+            The SHA of the commit.
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        create : bool
+            Create the branch instead of updating an existing one.
+        force : bool
+            Allow an update that is not a fast-forward.
+        client : GitHubClient
+            The GitHub API client, the one shared for the token by default.
+
+        Returns
+        -------
+        None
+        """
+        client = client or GitHubClient.shared(github_access_token)
+        if create:
+            data = {"ref": f"refs/heads/{branch_name}", "sha": commit_sha}
+            response = client.request("POST", f"/repos/{repo_owner}/{repo_name}/git/refs", json=data, idempotent=True)
+            if response.status_code == 422 and "already exists" in response.text and GitUtils.get_branch_sha(
+                repo_owner=repo_owner, 
+                repo_name=repo_name, 
+                branch_name=branch_name, 
+                github_access_token=github_access_token, 
+                client=client
+            ) == commit_sha:
+                # The branch was created by an attempt whose response was lost
+                logger.info(f"Branch '{branch_name}' already points to {commit_sha}.")
+                return
+        else:
+            data = {"sha": commit_sha, "force": force}
+            response = client.request("PATCH", f"/repos/{repo_owner}/{repo_name}/git/refs/heads/{branch_name}", json=data)
+        
+        if response.status_code in (200, 201):
+            logger.info(f"Branch '{branch_name}' now points to {commit_sha}.")
+        else:
+            logger.error(f"Failed to update branch '{branch_name}': {response.status_code} - {response.text}")
+            response.raise_for_status()
@@ -0,0 +1,306 @@
+import re
+import time
+import random
+import threading
+from loguru import logger
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+from utils.tracing import tracer
+from utils.rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    import requests
+
+
+class GitHubClient:
+    """
+    Client for the GitHub REST API shared by every call made with the same token.
+    Connections are kept alive in a pooled session and transient failures (5xx, 409 conflicts,
+    primary and secondary rate limits) are retried with a jittered exponential backoff.
+    The calls which are not idempotent, e.g. creating a pull request, are only retried when they
+    were rejected before being processed: a failure after they were sent may have applied them,
+    and their retry would create a duplicate. Their callers can opt in when a duplicate is detected
+    or harmless, e.g. the trees and the commits whose SHA is their content.
+    Calls are scheduled by the rate limiter of the token, shared with the clients of other API URLs.
+    `requests` is only imported when the first request is sent, so the git commands of a run
+    are not delayed by loading it.
+    """
+    API_URL = "https://api.github.com"
+    RETRY_STATUS_CODES = (409, 429, 500, 502, 503, 504)
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+    # Placeholders of the variable parts of the paths, to aggregate the spans of an endpoint
+    ROUTE_PATTERNS = (
+        (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{owner}/{repo}"),
+        (re.compile(r"/git/(refs?)/heads/.+$"), r"/git/\1/heads/{branch}"),
+        (re.compile(r"/contents/.+$"), "/contents/{path}"),
+        (re.compile(r"/[0-9a-f]{40}$"), "/{sha}"),
+        (re.compile(r"/\d+(?=/|$)"), "/{number}")
+    )
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(
+            self,
+            github_access_token: str,
+            api_url: str = API_URL,
+            timeout: float = 10.0,
+            max_retries: int = 4,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 60.0,
+            pool_size: int = 10,
+            mutations_per_minute: int = 80,
+            mutations_per_hour: int = 500
+        ) -> None:
+        """
+        Constructor of the GitHubClient class.
+
+        Attributes
+        ----------
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        api_url : str
+            The base URL of the GitHub REST API.
+        timeout : float
+            The connect and read timeout of each request, in seconds.
+        max_retries : int
+            The number of times a failed request is retried.
+        backoff_factor : float
+            The base delay of the exponential backoff, in seconds.
+        max_backoff : float
+            The longest delay between two attempts, in seconds. A rate limit or a
+            `Retry-After` header asking to wait longer than this is returned to the caller
+            instead of retried.
+        pool_size : int
+            The number of connections kept alive.
+        mutations_per_minute : int
+            The number of mutating calls sent per minute with the token, across all workflows.
+        mutations_per_hour : int
+            The number of mutating calls sent per hour with the token, across all workflows.
+        """
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.rate_limiter = RateLimiter.shared(
+            github_access_token, 
+            limits=((mutations_per_minute, 60.0), (mutations_per_hour, 3600.0)), 
+            max_wait=max_backoff
+        )
+        self.__github_access_token = github_access_token
+        self.__session = None
+        self.__session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        Get the pooled session, creating it on first use.
+
+        Returns
+        -------
+        requests.Session
+            The session sending the requests.
+        """
+        with self.__session_lock:
+            if self.__session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers.update({
+                    "Authorization": f"Bearer {self.__github_access_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                })
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.__session = session
+            return self.__session
+
+    @classmethod
+    def shared(cls, github_access_token: str, api_url: str = API_URL, **kwargs) -> "GitHubClient":
+        """
+        Get the client shared by every caller using the same token and API URL, creating it if needed.
+
+        Parameters
+        ----------
+        github_access_token : str
+            The GitHub Personal Access Token for authentication.
+        api_url : str
+            The base URL of the GitHub REST API.
+        **kwargs
+            The other constructor arguments, only used when the client is created.
+
+        Returns
+        -------
+        GitHubClient
+            The shared client.
+        """
+        key = (github_access_token, api_url.rstrip("/"))
+        with cls._clients_lock:
+            if key not in cls._clients:
+                cls._clients[key] = cls(github_access_token, api_url=api_url, **kwargs)
+            return cls._clients[key]
+
+    def request(self, method: str, path: str, retry_status_codes: tuple = RETRY_STATUS_CODES, idempotent: bool = None, **kwargs) -> "requests.Response":
+        """
+        Send a request to the GitHub API, retrying transient failures.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method e.g. "POST".
+        path : str
+            The path of the endpoint e.g. "/repos/owner/name/pulls", or a full URL.
+        retry_status_codes : tuple
+            The status codes retried, for endpoints where they mean something else than a transient failure.
+            Rate limited responses are always retried.
+        idempotent : bool
+            Whether the call can be sent twice without creating a duplicate, by default whether the
+            method is idempotent. Otherwise, the server errors and the failures after the request was
+            sent e.g. a read timeout are not retried.
+        **kwargs
+            Extra arguments given to `requests.Session.request` e.g. `json`.
+
+        Returns
+        -------
+        requests.Response
+            The last response received, the caller checks its status code.
+        """
+        session = self.session
+        import requests
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        if idempotent is None:
+            idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        if not idempotent:
+            # Only the conflicts are rejected before any change, the server errors may come after it
+            retry_status_codes = tuple(code for code in retry_status_codes if code < 500)
+        attempt = 0
+        with tracer.span(f"{method} {self.__route(url)}", kind="client", method=method, url=url) as span:
+            while True:
+                self.rate_limiter.acquire(method)
+                try:
+                    response = session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    # A connect timeout is the only failure where the request was surely never sent
+                    if attempt >= self.max_retries or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                        span.set(attempts=attempt + 1)
+                        raise
+                    delay = self.__backoff(attempt)
+                    logger.warning(f"GitHub API {method} {path} failed: {e}, retrying in {delay:.1f}s...")
+                else:
+                    self.rate_limiter.update(response.headers)
+                    delay = self.__retry_delay(response, attempt, retry_status_codes)
+                    if delay is None:
+                        body = response.request.body or b""
+                        span.set(
+                            status_code=response.status_code, 
+                            attempts=attempt + 1, 
+                            request_bytes=len(body.encode() if isinstance(body, str) else body), 
+                            response_bytes=len(response.content)
+                        )
+                        if response.status_code >= 400:
+                            span.status = "error"
+                        return response
+                    logger.warning(f"GitHub API {method} {path} returned {response.status_code}, retrying in {delay:.1f}s...")
+                    if self.__is_rate_limited(response):
+                        # Every caller using the token waits, not only this one, the next attempt waits in the limiter
+                        self.rate_limiter.block(delay)
+                        delay = 0.0
+                time.sleep(delay)
+                attempt += 1
+
+    def __route(self, url: str) -> str:
+        """
+        Get the endpoint of a URL, with placeholders for its variable parts.
+
+        Parameters
+        ----------
+        url : str
+            The URL e.g. "https://api.github.com/repos/owner/name/pulls/12/merge".
+
+        Returns
+        -------
+        str
+            The endpoint e.g. "/repos/{owner}/{repo}/pulls/{number}/merge".
+        """
+        route = urlsplit(url).path.removeprefix(urlsplit(self.api_url).path)
+        for pattern, placeholder in self.ROUTE_PATTERNS:
+            route = pattern.sub(placeholder, route)
+        return route
+
+    def __backoff(self, attempt: int) -> float:
+        """
+        Compute an exponential backoff delay with full jitter.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts already failed, minus one.
+
+        Returns
+        -------
+        float
+            The delay before the next attempt, in seconds.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def __is_rate_limited(self, response: "requests.Response") -> bool:
+        """
+        Check if a response rejects a call because of a primary or secondary rate limit.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The response received.
+
+        Returns
+        -------
+        bool
+            True if the call was rate limited, False otherwise.
+        """
+        return response.status_code == 429 or (
+            response.status_code == 403 and (
+                "Retry-After" in response.headers
+                or response.headers.get("X-RateLimit-Remaining") == "0"
+                or "secondary rate limit" in response.text.lower()
+            )
+        )
+
+    def __retry_delay(self, response: "requests.Response", attempt: int, retry_status_codes: tuple) -> float | None:
+        """
+        Decide whether a response should be retried and how long to wait before it.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The response received.
+        attempt : int
+            The number of attempts already failed, minus one.
+        retry_status_codes : tuple
+            The status codes retried.
+
+        Returns
+        -------
+        float | None
+            The delay before the next attempt in seconds, or None to return the response.
+        """
+        rate_limited = self.__is_rate_limited(response)
+        if attempt >= self.max_retries or not (rate_limited or response.status_code in retry_status_codes):
+            return None
+
+        delay = self.__backoff(attempt)
+        if "Retry-After" in response.headers:
+            delay = float(response.headers["Retry-After"])
+        elif rate_limited and response.headers.get("X-RateLimit-Remaining") == "0":
+            delay = float(response.headers.get("X-RateLimit-Reset", 0)) - time.time()
+        elif rate_limited:
+            # Secondary rate limit without any hint, GitHub asks to wait at least one minute
+            delay = max(delay, 60.0)
+
+        if delay > self.max_backoff:
+            reason = "rate limit" if rate_limited else f"{response.status_code} response"
+            logger.warning(f"GitHub API {reason} requires waiting {delay:.0f}s, giving up.")
+            return None
+        return max(delay, 0.0)
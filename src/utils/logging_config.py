@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import queue
+import random
+import threading
+from loguru import logger
+
+
+class BackgroundStream:
+    """
+    Stream writing the logs of its callers from a background thread. The callers only queue the
+    formatted messages, unlike the `enqueue` option of loguru which pickles them through a
+    multiprocessing queue, and the writer flushes the stream once the queue is drained.
+    The queued messages are written when the sink is removed, e.g. at the exit of the process.
+    """
+
+    def __init__(self, stream) -> None:
+        """
+        Constructor of the BackgroundStream class, the writer starts right away.
+
+        Attributes
+        ----------
+        stream
+            The stream the logs are written to, e.g. `sys.stderr`.
+        """
+        self.stream = stream
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self.__write_queued, name="log writer", daemon=True)
+        self.writer.start()
+
+    def write(self, message: str) -> None:
+        self.queue.put(message)
+
+    def isatty(self) -> bool:
+        return callable(getattr(self.stream, "isatty", None)) and self.stream.isatty()
+
+    def stop(self) -> None:
+        """
+        Write the queued logs then stop the writer.
+        """
+        self.queue.put(None)
+        self.writer.join()
+
+    def __write_queued(self) -> None:
+        """
+        Write the queued logs until the stream is stopped.
+        """
+        flush = getattr(self.stream, "flush", None)
+        while (message := self.queue.get()) is not None:
+            self.stream.write(message)
+            if self.queue.empty() and flush:
+                flush()
+        if flush:
+            flush()
+
+
+class LoggingConfig:
+    """
+    Configure the loguru sink of the process. Besides the default text lines, the logs can be
+    written as one JSON object per line with the run and repository IDs bound by the workflows,
+    from a background thread so that a slow output never blocks the commit loop. The per-command
+    messages of `GitUtils` can be sampled below the warning level, and long messages, e.g. error
+    responses of the GitHub API, truncated.
+    """
+    FORMATS = ("text", "json")
+    TEXT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{extra[_message]}</level>\n{exception}"
+    # Modules logging a few messages for each git command or API call
+    SAMPLED_MODULES = ("utils.git_utils", "utils.git_backends")
+
+    def __init__(self, format: str = "text", level: str = "DEBUG", enqueue: bool = False, sample_rate: float = 1.0, max_length: int = 0) -> None:
+        """
+        Constructor of the LoggingConfig class.
+
+        Attributes
+        ----------
+        format : str
+            "text" for the default colored lines, "json" for one JSON object per line.
+        level : str
+            The lowest level logged e.g. "INFO".
+        enqueue : bool
+            Write the logs from a background thread, the callers only format and queue them.
+            Streams are wrapped in a `BackgroundStream`, the other sinks e.g. paths use the
+            `enqueue` option of loguru.
+        sample_rate : float
+            The share of the per-command messages below the warning level that are kept, 1 keeps them all.
+        max_length : int
+            The longest message logged, longer ones are truncated, 0 to never truncate them.
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported log format '{format}', expected one of {self.FORMATS}.")
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Unsupported log sample rate {sample_rate}, expected a share between 0 and 1.")
+        if max_length < 0:
+            raise ValueError(f"Unsupported log max length {max_length}, expected 0 or more.")
+        self.format = format
+        self.level = level
+        self.enqueue = enqueue
+        self.sample_rate = sample_rate
+        self.max_length = max_length
+        # The draws must not change the sequence of the sentences and moods seeded by the workflow
+        self.random = random.Random()
+
+    @classmethod
+    def from_env(cls) -> "LoggingConfig":
+        """
+        Create the configuration from the LOG_* environment variables of the entry points.
+
+        Returns
+        -------
+        LoggingConfig
+            The configuration, the defaults of the constructor where a variable is not set.
+        """
+        try:
+            sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+        except ValueError:
+            raise ValueError(f"Unsupported LOG_SAMPLE_RATE '{os.getenv('LOG_SAMPLE_RATE')}', expected a share between 0 and 1.") from None
+        try:
+            max_length = int(os.getenv("LOG_MAX_LENGTH", "0"))
+        except ValueError:
+            raise ValueError(f"Unsupported LOG_MAX_LENGTH '{os.getenv('LOG_MAX_LENGTH')}', expected a number of characters.") from None
+        return cls(
+            format=os.getenv("LOG_FORMAT", "text"),
+            level=os.getenv("LOG_LEVEL", "DEBUG"),
+            enqueue=os.getenv("LOG_ENQUEUE", "false").lower() == "true",
+            sample_rate=sample_rate,
+            max_length=max_length
+        )
+
+    def apply(self, sink=sys.stderr) -> int:
+        """
+        Replace the sinks of the logger with the configured one.
+
+        Parameters
+        ----------
+        sink
+            Where the logs are written, a stream, a path or any loguru sink.
+
+        Returns
+        -------
+        int
+            The identifier of the sink, to remove it.
+        """
+        # Checked before the sinks are removed so that an unknown level can still be reported
+        if isinstance(self.level, str):
+            logger.level(self.level)
+        logger.remove()
+        streamed = callable(getattr(sink, "write", None))
+        return logger.add(
+            BackgroundStream(sink) if self.enqueue and streamed else sink,
+            level=self.level,
+            format=self.__format_json if self.format == "json" else self.__format_text,
+            filter=self.__filter if self.sample_rate < 1 else None,
+            enqueue=self.enqueue and not streamed,
+            colorize=None if self.format == "text" else False
+        )
+
+    def __filter(self, record: dict) -> bool:
+        """
+        Keep a sample of the per-command messages below the warning level, and every other message.
+        """
+        if record["level"].no >= 30 or record["name"] not in self.SAMPLED_MODULES:
+            return True
+        return self.random.random() < self.sample_rate
+
+    def __message(self, record: dict) -> str:
+        """
+        Get the message of a record, truncated if it is too long.
+        """
+        message = record["message"]
+        if self.max_length and len(message) > self.max_length:
+            return f"{message[:self.max_length]}... ({len(message) - self.max_length} more characters)"
+        return message
+
+    def __format_text(self, record: dict) -> str:
+        """
+        Format a record as the default text line.
+        """
+        record["extra"]["_message"] = self.__message(record)
+        return self.TEXT_FORMAT
+
+    def __format_json(self, record: dict) -> str:
+        """
+        Format a record as a JSON object, the values bound to the logger e.g. the run ID included.
+        """
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": self.__message(record),
+            "module": record["name"],
+            "function": record["function"],
+            "line": record["line"]
+        }
+        entry.update((key, value) for key, value in record["extra"].items() if not key.startswith("_"))
+        if record["exception"]:
+            entry["exception"] = f"{record['exception'].type.__name__}: {record['exception'].value}"
+        # The JSON is written as a value of the record, its braces are not a template
+        record["extra"]["_json"] = json.dumps(entry, default=str)
+        return "{extra[_json]}\n"
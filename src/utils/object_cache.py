@@ -0,0 +1,111 @@
+import time
+import fcntl
+import subprocess
+from pathlib import Path
+from loguru import logger
+from contextlib import contextmanager
+from typing import Iterator
+from utils.git_utils import GitUtils
+
+
+class ObjectCache:
+    """
+    Persistent object store shared by the clones of a host, one bare repository per remote repository.
+    The store is fetched before each clone, which then borrows its objects with `--reference`
+    (git alternates) and downloads nothing already known to the host. The store is locked with
+    `flock`, exclusively to be fetched or maintained and shared by the clones reading it.
+    Clones depend on the objects of the store, so its maintenance never prunes any object.
+    """
+    # Tasks of `git maintenance` that repack objects without deleting any of them
+    MAINTENANCE_TASKS = ("loose-objects", "incremental-repack", "commit-graph", "pack-refs")
+    MAINTENANCE_STAMP = "super-dev-maintenance"
+
+    def __init__(self, cache_folder: str, maintenance_interval: float = 86400.0) -> None:
+        """
+        Constructor of the ObjectCache class.
+
+        Attributes
+        ----------
+        cache_folder : str
+            The folder of the stores, created if needed.
+        maintenance_interval : float
+            The time between two maintenances of a store, in seconds.
+        """
+        self.cache_folder = Path(cache_folder)
+        self.maintenance_interval = maintenance_interval
+
+    def store_path(self, repository_url: str) -> Path:
+        """
+        Get the path of the store of a repository.
+
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the repository, without credentials.
+
+        Returns
+        -------
+        Path
+            The path of the bare repository e.g. "<cache>/github.com_owner_name.git".
+        """
+        return self.cache_folder / f"{GitUtils.repository_slug(repository_url)}.git"
+
+    @contextmanager
+    def lock(self, store: Path, exclusive: bool) -> Iterator[None]:
+        """
+        Lock a store for the duration of a block, waiting for the other holders.
+
+        Parameters
+        ----------
+        store : Path
+            The path of the store.
+        exclusive : bool
+            True to change the store, False to read it alongside other readers.
+        """
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        with open(f"{store}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def update(self, repository_url: str, github_access_token: str) -> Path:
+        """
+        Create the store of a repository if needed and fetch its branches, then maintain it if it is due.
+
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the repository.
+        github_access_token : str
+            The personal access token for authentication.
+
+        Returns
+        -------
+        Path
+            The path of the store, to clone with `--reference`.
+        """
+        store = self.store_path(repository_url)
+        with self.lock(store, exclusive=True):
+            if not (store / "HEAD").exists():
+                logger.info(f"Creating the object store {store}...")
+                GitUtils.run_command(["git", "init", "--quiet", "--bare", str(store)])
+            logger.info(f"Fetching {repository_url} into the object store...")
+            # The URL is not saved as a remote so that the token is not written to the store,
+            # and the objects fetched are kept packed however few they are
+            GitUtils.run_command(
+                ["git", "-c", "fetch.unpackLimit=1", "fetch", "--quiet", "--prune", "--no-tags", GitUtils.authenticated_url(repository_url, github_access_token), "+refs/heads/*:refs/heads/*"],
+                cwd=store
+            )
+            stamp = store / self.MAINTENANCE_STAMP
+            if not stamp.exists() or time.time() - stamp.stat().st_mtime >= self.maintenance_interval:
+                logger.info(f"Maintaining the object store {store}...")
+                try:
+                    GitUtils.run_command(["git", "maintenance", "run", "--quiet"] + [f"--task={task}" for task in self.MAINTENANCE_TASKS], cwd=store)
+                except subprocess.CalledProcessError:
+                    # The store stays usable unmaintained, the maintenance is tried again on the next update
+                    logger.warning(f"Failed to maintain the object store {store}, continuing without it.")
+                else:
+                    stamp.touch()
+        return store
@@ -0,0 +1,167 @@
+import time
+import threading
+from loguru import logger
+from utils.tracing import tracer
+
+
+class RateLimiter:
+    """
+    Request scheduler shared by every call made with the same GitHub token, whatever the workflow.
+    Calls are delayed before GitHub rejects them:
+    - mutating calls draw from token buckets matching the secondary rate limits on content creation,
+    - the primary budget is followed from the `X-RateLimit-Remaining` and `X-RateLimit-Reset` headers,
+    - a rate limited response blocks every caller until the time GitHub asked to wait.
+    Callers are queued in order, each one reserves its slot before waiting.
+    """
+    MUTATING_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+    # GitHub allows 80 content creating requests per minute and 500 per hour
+    LIMITS = ((80, 60.0), (500, 3600.0))
+    _limiters = {}
+    _limiters_lock = threading.Lock()
+
+    def __init__(self, limits: tuple = LIMITS, reserve: int = 0, max_wait: float = 60.0) -> None:
+        """
+        Constructor of the RateLimiter class.
+
+        Attributes
+        ----------
+        limits : tuple
+            The (number of calls, period in seconds) limits of the mutating calls, each one is a token bucket
+            holding up to the number of calls and refilled over the period.
+        reserve : int
+            The number of calls of the primary budget left unused, for other tools sharing the token.
+        max_wait : float
+            The longest delay before a call when the primary budget is exhausted, in seconds. A call needing
+            to wait longer for the budget reset is sent right away and its rate limited response is returned
+            to the caller. The pace of the mutating calls is always kept.
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.buckets = [{"capacity": calls, "rate": calls / period, "tokens": float(calls), "updated": time.monotonic()} for calls, period in limits]
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = {}
+
+    @classmethod
+    def shared(cls, github_access_token: str, **kwargs) -> "RateLimiter":
+        """
+        Get the limiter shared by every caller using the same token, creating it if needed.
+
+        Parameters
+        ----------
+        github_access_token : str
+            The GitHub Personal Access Token the limits apply to.
+        **kwargs
+            The other constructor arguments, only used when the limiter is created.
+
+        Returns
+        -------
+        RateLimiter
+            The shared limiter.
+        """
+        with cls._limiters_lock:
+            if github_access_token not in cls._limiters:
+                cls._limiters[github_access_token] = cls(**kwargs)
+            return cls._limiters[github_access_token]
+
+    @classmethod
+    def metrics(cls) -> dict:
+        """
+        Get the metrics of all the shared limiters.
+
+        Returns
+        -------
+        dict
+            The number of requests scheduled, of requests delayed, and the time spent waiting
+            in seconds by reason: "secondary" for the mutating calls pace and rate limited responses,
+            "primary" for the exhausted budget of the token.
+        """
+        with cls._limiters_lock:
+            limiters = list(cls._limiters.values())
+        metrics = {"requests": 0, "waits": 0, "wait_time": {}}
+        for limiter in limiters:
+            with limiter.lock:
+                metrics["requests"] += limiter.requests
+                metrics["waits"] += limiter.waits
+                for reason, wait_time in limiter.wait_time.items():
+                    metrics["wait_time"][reason] = metrics["wait_time"].get(reason, 0.0) + wait_time
+        return metrics
+
+    def acquire(self, method: str) -> float:
+        """
+        Wait until a call can be sent without being rate limited.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the call, mutating calls are paced.
+
+        Returns
+        -------
+        float
+            The time waited, in seconds.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.requests += 1
+            delays = {"secondary": self.blocked_until - now}
+            if self.remaining is not None:
+                if self.remaining <= self.reserve:
+                    delays["primary"] = self.reset_at - time.time()
+                    if delays["primary"] > self.max_wait:
+                        logger.warning(f"GitHub API rate limit resets in {delays.pop('primary'):.0f}s, sending the request anyway.")
+                self.remaining -= 1
+            if method.upper() in self.MUTATING_METHODS:
+                for bucket in self.buckets:
+                    bucket["tokens"] = min(bucket["capacity"], bucket["tokens"] + (now - bucket["updated"]) * bucket["rate"])
+                    bucket["updated"] = now
+                    # The token is taken even when there is none left, the next callers queue behind
+                    bucket["tokens"] -= 1
+                    if bucket["tokens"] < 0:
+                        delays["secondary"] = max(delays["secondary"], -bucket["tokens"] / bucket["rate"])
+            reason, delay = max(delays.items(), key=lambda item: item[1])
+            if delay <= 0:
+                return 0.0
+            self.waits += 1
+            self.wait_time[reason] = self.wait_time.get(reason, 0.0) + delay
+
+        logger.info(f"Waiting {delay:.1f}s for the GitHub API {reason} rate limit...")
+        with tracer.span("rate limit wait", reason=reason, method=method, delay=delay):
+            time.sleep(delay)
+        return delay
+
+    def update(self, headers: dict) -> None:
+        """
+        Follow the primary budget of the token from the headers of a response.
+
+        Parameters
+        ----------
+        headers : dict
+            The headers of the response.
+        """
+        if "X-RateLimit-Remaining" not in headers or "X-RateLimit-Reset" not in headers:
+            return
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset_at = float(headers["X-RateLimit-Reset"])
+        with self.lock:
+            # Responses of concurrent calls arrive out of order, the lowest count of a window is the latest
+            if reset_at == self.reset_at and self.remaining is not None:
+                remaining = min(remaining, self.remaining)
+            self.remaining = remaining
+            self.reset_at = reset_at
+
+    def block(self, delay: float) -> None:
+        """
+        Hold every call for a while after a rate limited response.
+
+        Parameters
+        ----------
+        delay : float
+            The time to wait, in seconds.
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
@@ -0,0 +1,137 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from loguru import logger
+from utils.git_utils import GitUtils
+
+
+class RepositoryCache:
+    """
+    Copy of a repository kept between runs, for jobs whose working folder never survives them,
+    e.g. on a volume mounted by every run. A run restores the repository from the cache instead
+    of cloning it, then only fetches the commits pushed since the copy was made. The copy is
+    refreshed after each successful run and swapped in atomically, a run never restores a partial
+    copy. The cache holds:
+    - "bundle": a single git bundle file per repository, for full clones,
+    - "directory": a copy of the `.git` folder per repository, for any clone strategy.
+    The token is never written to the cache.
+    """
+    FORMATS = ("bundle", "directory")
+
+    def __init__(self, cache_folder: str, format: str = "bundle") -> None:
+        """
+        Constructor of the RepositoryCache class.
+
+        Attributes
+        ----------
+        cache_folder : str
+            The folder of the cached repositories, created if needed.
+        format : str
+            How the repositories are cached, "bundle" or "directory".
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported repository cache format '{format}', expected one of {self.FORMATS}.")
+        self.cache_folder = Path(cache_folder)
+        self.format = format
+
+    def cache_path(self, repository_url: str) -> Path:
+        """
+        Get the path of the cached copy of a repository.
+
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the repository, without credentials.
+
+        Returns
+        -------
+        Path
+            The path of the bundle e.g. "<cache>/github.com_owner_name.bundle",
+            or of the link to the current copy of the `.git` folder e.g. "<cache>/github.com_owner_name.git".
+        """
+        suffix = "bundle" if self.format == "bundle" else "git"
+        return self.cache_folder / f"{GitUtils.repository_slug(repository_url)}.{suffix}"
+
+    def restore(self, repository_url: str, local_path: Path, github_access_token: str, branch_name: str) -> bool:
+        """
+        Restore a repository from the cache. A failed restore is cleaned up so that the repository is cloned instead.
+
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the repository.
+        local_path : Path
+            The local path where the repository will be restored, which must not exist.
+        github_access_token : str
+            The personal access token for authentication.
+        branch_name : str
+            The branch checked out once restored.
+
+        Returns
+        -------
+        bool
+            True if the repository was restored, False if it is not cached or could not be restored.
+        """
+        cache_path = self.cache_path(repository_url)
+        if not cache_path.exists():
+            logger.info(f"{repository_url} is not cached yet.")
+            return False
+        try:
+            logger.info(f"Restoring the repository from {cache_path}...")
+            if self.format == "bundle":
+                GitUtils.run_command(["git", "init", "--quiet", str(local_path)])
+                GitUtils.run_command(["git", "fetch", "--quiet", "--update-head-ok", str(cache_path), "+refs/*:refs/*"], cwd=local_path)
+                GitUtils.run_command(["git", "remote", "add", "origin", GitUtils.authenticated_url(repository_url, github_access_token)], cwd=local_path)
+                GitUtils.run_command(["git", "symbolic-ref", "HEAD", f"refs/heads/{branch_name}"], cwd=local_path)
+            else:
+                # The link is resolved once, a refresh replacing it meanwhile does not mix two copies
+                shutil.copytree(cache_path.resolve(strict=True), Path(local_path) / ".git", symlinks=True)
+                GitUtils.run_command(["git", "remote", "set-url", "origin", GitUtils.authenticated_url(repository_url, github_access_token)], cwd=local_path)
+                GitUtils.run_command(["git", "checkout", "--quiet", "--force", branch_name], cwd=local_path)
+            GitUtils.run_command(["git", "reset", "--quiet", "--hard"], cwd=local_path)
+            return True
+        except (subprocess.CalledProcessError, OSError) as e:
+            logger.warning(f"Failed to restore the repository from {cache_path}, cloning it instead: {e}")
+            shutil.rmtree(local_path, ignore_errors=True)
+            return False
+
+    def save(self, repository_url: str, local_path: Path) -> None:
+        """
+        Replace the cached copy of a repository with the local one.
+        The new copy is written next to the current one then swapped in with a rename.
+
+        Parameters
+        ----------
+        repository_url : str
+            The URL of the repository.
+        local_path : Path
+            The local path of the repository.
+        """
+        cache_path = self.cache_path(repository_url)
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        # Unique per process and thread, concurrent runs do not write to the same temporary copy
+        temporary = cache_path.with_name(f"{cache_path.name}.{os.getpid()}-{os.urandom(4).hex()}")
+        logger.info(f"Saving the repository to {cache_path}...")
+        if self.format == "bundle":
+            try:
+                GitUtils.run_command(["git", "bundle", "create", "--quiet", str(temporary), "--all"], cwd=local_path)
+                os.replace(temporary, cache_path)
+            finally:
+                temporary.unlink(missing_ok=True)
+            return
+
+        # A directory can not be replaced atomically, the cache path is a link swapped to the new copy
+        previous = cache_path.resolve() if cache_path.is_symlink() else None
+        link = temporary.with_name(f"{temporary.name}.link")
+        try:
+            shutil.copytree(Path(local_path) / ".git", temporary, symlinks=True)
+            GitUtils.run_command(["git", "--git-dir", str(temporary), "remote", "set-url", "origin", repository_url])
+            os.symlink(temporary.name, link)
+            os.replace(link, cache_path)
+        except BaseException:
+            link.unlink(missing_ok=True)
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
@@ -0,0 +1,207 @@
+import os
+import json
+import math
+import time
+import resource
+from pathlib import Path
+from loguru import logger
+
+
+class ResourceReport:
+    """
+    Resources used by the workflow runs of the process, to check the sizing and the cost of the
+    Cloud Run job: CPU time per phase split between Python and the child `git` processes, peak
+    memory, network bytes, and the vCPU-seconds and GiB-seconds billed for the run.
+    The phases are the spans directly under the root span of each run, e.g. "clone" or "commits".
+    The network counters are read from `/proc/net/dev` for the whole container, loopback excluded,
+    and are left out where the file does not exist. The billed time starts with the process,
+    the interpreter start and the imports included, when `/proc` tells when it started.
+    """
+    NETWORK_STATISTICS = Path("/proc/net/dev")
+
+    def __init__(self, vcpus: float = 1.0, memory_gib: float = 0.5, minimum_billed: float = 60.0, from_process_start: bool = True) -> None:
+        """
+        Constructor of the ResourceReport class, the measures start right away.
+
+        Attributes
+        ----------
+        vcpus : float
+            The number of vCPUs allocated to the job.
+        memory_gib : float
+            The memory allocated to the job, in GiB.
+        minimum_billed : float
+            The shortest duration billed for a run, in seconds.
+        from_process_start : bool
+            Measure the time and CPU since the process started, False to measure them since the
+            report was created e.g. for one run of a long running service. The peak memory is always
+            the one of the process.
+        """
+        self.vcpus = vcpus
+        self.memory_gib = memory_gib
+        self.minimum_billed = minimum_billed
+        self.from_process_start = from_process_start
+        self.start = time.perf_counter()
+        self.start_network = self.__network()
+        self.start_cpu = (0.0, 0.0, 0.0, 0.0)
+        if not from_process_start:
+            own = resource.getrusage(resource.RUSAGE_SELF)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            self.start_cpu = (own.ru_utime, own.ru_stime, children.ru_utime, children.ru_stime)
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "ResourceReport":
+        """
+        Create a report for the job sized by the JOB_CPU and JOB_MEMORY_GIB environment variables.
+
+        Parameters
+        ----------
+        **kwargs
+            The other constructor arguments.
+
+        Returns
+        -------
+        ResourceReport
+            The report, its measures started.
+        """
+        return cls(
+            vcpus=float(os.getenv("JOB_CPU", "1")), 
+            memory_gib=float(os.getenv("JOB_MEMORY_GIB", "0.5")),
+            **kwargs
+        )
+
+    def __process_age(self) -> float:
+        """
+        Get the time since the process started.
+
+        Returns
+        -------
+        float
+            The age of the process in seconds, None where it can not be read.
+        """
+        try:
+            # The start time is the 22nd field, counted after the command name which may contain spaces
+            start_ticks = int(Path("/proc/self/stat").read_text().rsplit(")", 1)[1].split()[19])
+            uptime = float(Path("/proc/uptime").read_text().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+    def __network(self) -> dict:
+        """
+        Read the bytes received and sent by the network interfaces of the container.
+
+        Returns
+        -------
+        dict
+            The "received" and "sent" byte counts, None where they can not be read.
+        """
+        try:
+            lines = self.NETWORK_STATISTICS.read_text().splitlines()[2:]
+        except OSError:
+            return None
+        received = sent = 0
+        for line in lines:
+            interface, counters = line.split(":", 1)
+            if interface.strip() == "lo":
+                continue
+            counters = counters.split()
+            received += int(counters[0])
+            sent += int(counters[8])
+        return {"received": received, "sent": sent}
+
+    def build(self, spans: list) -> dict:
+        """
+        Build the report of the runs since the report was created.
+
+        Parameters
+        ----------
+        spans : list
+            The finished spans of the runs.
+
+        Returns
+        -------
+        dict
+            The JSON serializable report.
+        """
+        wall_time = time.perf_counter() - self.start
+        process_time = (self.__process_age() if self.from_process_start else None) or wall_time
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = dict(zip(
+            ("python_user", "python_system", "git_user", "git_system"), 
+            (end - start for start, end in zip(self.start_cpu, (own.ru_utime, own.ru_stime, children.ru_utime, children.ru_stime)))
+        ))
+        # `ru_maxrss` is in KiB on Linux
+        peak_rss_mib = own.ru_maxrss / 1024
+        billed = max(math.ceil(process_time), self.minimum_billed)
+
+        roots = {span.span_id for span in spans if span.parent_id is None}
+        phases = {}
+        for span in spans:
+            if span.parent_id not in roots or span.usage is None:
+                continue
+            phase = phases.setdefault(span.name, {"count": 0, "wall_time": 0.0, "python_cpu": 0.0, "git_cpu": 0.0})
+            phase["count"] += 1
+            phase["wall_time"] += span.duration
+            phase["python_cpu"] += span.usage["user"] + span.usage["system"]
+            phase["git_cpu"] += span.usage["children_user"] + span.usage["children_system"]
+
+        network = None
+        end_network = self.__network()
+        if self.start_network and end_network:
+            network = {direction: end_network[direction] - self.start_network[direction] for direction in end_network}
+        return {
+            "wall_time": round(wall_time, 3),
+            "process_time": round(process_time, 3),
+            "cpu": {key: round(value, 3) for key, value in cpu.items()},
+            "phases": {name: {key: round(value, 3) for key, value in phase.items()} for name, phase in phases.items()},
+            "peak_rss_mib": round(peak_rss_mib, 1),
+            "git_peak_rss_mib": round(children.ru_maxrss / 1024, 1),
+            "network_bytes": network,
+            "billing": {
+                "vcpus": self.vcpus,
+                "memory_gib": self.memory_gib,
+                "billed_seconds": billed,
+                "vcpu_seconds": round(billed * self.vcpus, 3),
+                "gib_seconds": round(billed * self.memory_gib, 3),
+                "cpu_utilization": round(sum(cpu.values()) / (process_time * self.vcpus), 3),
+                "memory_utilization": round(max(peak_rss_mib, children.ru_maxrss / 1024) / (self.memory_gib * 1024), 3)
+            }
+        }
+
+    def summary(self, report: dict) -> str:
+        """
+        Summarize a report in one line, to be logged.
+
+        Parameters
+        ----------
+        report : dict
+            The report.
+
+        Returns
+        -------
+        str
+            The summary.
+        """
+        cpu = report["cpu"]
+        return (
+            f"{report['wall_time']:.1f}s wall, {cpu['python_user'] + cpu['python_system']:.2f}s CPU in Python "
+            f"and {cpu['git_user'] + cpu['git_system']:.2f}s in git, peak RSS {report['peak_rss_mib']:.0f} MiB "
+            f"({report['billing']['memory_utilization']:.0%} of the allocated memory), billed "
+            f"{report['billing']['vcpu_seconds']:.0f} vCPU-seconds and {report['billing']['gib_seconds']:.0f} GiB-seconds."
+        )
+
+    def write(self, report: dict, path: str) -> None:
+        """
+        Write a report to a JSON file.
+
+        Parameters
+        ----------
+        report : dict
+            The report.
+        path : str
+            The path of the file, replaced if it exists.
+        """
+        with open(path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Resource report written to {path}.")
@@ -0,0 +1,108 @@
+import os
+import json
+import threading
+from pathlib import Path
+from loguru import logger
+
+
+class RunJournal:
+    """
+    Progress of a workflow run, saved after each completed step so that a failed run is resumed
+    by the next attempt instead of started over: the same sentences are committed, and the commits
+    pushed and the pull requests created or merged are not done twice.
+    The journal is replaced atomically on each save, and deleted once the run succeeds.
+    Without a path the journal is only kept in memory.
+    """
+
+    def __init__(self, path: Path = None) -> None:
+        """
+        Constructor of the RunJournal class, the journal left by a failed run is loaded.
+
+        Attributes
+        ----------
+        path : Path
+            The path of the JSON journal, None to keep it in memory.
+        """
+        self.path = Path(path) if path else None
+        self.state = {}
+        self.lock = threading.Lock()
+        if self.path and self.path.exists():
+            self.state = json.loads(self.path.read_text())
+        self.resumed = bool(self.state)
+
+    def get(self, key: str, default=None):
+        """
+        Get a value recorded when the run started.
+
+        Parameters
+        ----------
+        key : str
+            The name of the value e.g. "sentences".
+        default
+            The value returned when it was not recorded.
+        """
+        return self.state.get(key, default)
+
+    def record(self, **values) -> None:
+        """
+        Record the values describing the run, e.g. the sentences to commit, and save the journal.
+        """
+        with self.lock:
+            self.state.update(values)
+            self.__save()
+
+    def done(self, step: str) -> bool:
+        """
+        Check if a step of the run is completed.
+
+        Parameters
+        ----------
+        step : str
+            The name of the step e.g. "pushed".
+
+        Returns
+        -------
+        bool
+            True if the step was completed by this attempt or a previous one.
+        """
+        return step in self.state.get("steps", {})
+
+    def result(self, step: str):
+        """
+        Get the result of a completed step e.g. the number of a pull request, None if it is not completed.
+        """
+        return self.state.get("steps", {}).get(step)
+
+    def complete(self, step: str, result=True) -> None:
+        """
+        Record a completed step and save the journal, before the next step starts.
+
+        Parameters
+        ----------
+        step : str
+            The name of the step.
+        result
+            What the next attempts need to know about the step, JSON serializable.
+        """
+        with self.lock:
+            self.state.setdefault("steps", {})[step] = result
+            self.__save()
+
+    def finish(self) -> None:
+        """
+        Delete the journal of a successful run, the next run starts a new one.
+        """
+        if self.path:
+            self.path.unlink(missing_ok=True)
+
+    def __save(self) -> None:
+        """
+        Write the journal to a temporary file then rename it, a crash leaves the previous version.
+        """
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(self.state, indent=4))
+        os.replace(temporary, self.path)
+        logger.debug(f"Run journal saved to {self.path}.")
@@ -0,0 +1,173 @@
+import sys
+import random
+from array import array
+from typing import Iterator
+
+
+# Compact table of common English words, split once at import
+WORDS = tuple("""
+ability able about above accept account across act action activity actually add address admit adult affect
+after again against age agency agent ago agree ahead air all allow almost alone along already also although
+always amount analysis and animal another answer any anyone anything appear apply approach area argue arm
+around arrive art article artist ask assume attack attention audience author available avoid away baby back
+bad bag ball bank bar base beat beautiful because become bed before begin behavior behind believe benefit best
+better between beyond big bill billion bit black blood blue board body book born both box boy break bring
+brother budget build building business but buy call camera campaign can cancer capital car card care career
+carry case catch cause cell center central century certain chair challenge chance change character charge check
+child choice choose church citizen city civil claim class clear close coach cold collection college color come
+common community company compare computer concern condition conference consider consumer contain continue control
+cost could country couple course court cover create crime cultural culture cup current customer cut dark data
+daughter day dead deal death debate decade decide decision deep defense degree democratic describe design despite
+detail determine develop difference different difficult dinner direction director discover discuss disease doctor
+dog door down draw dream drive drop drug during each early east easy eat economic economy edge education effect
+effort eight either election else employee end energy enjoy enough enter entire environment especially establish
+even evening event ever every evidence exactly example executive exist expect experience expert explain eye face
+fact factor fail fall family far fast father fear federal feel feeling few field fight figure fill film final
+finally financial find fine finger finish fire firm first fish five floor fly focus follow food foot force foreign
+forget form former forward four free friend from front full fund future game garden gas general generation get
+girl give glass goal good government great green ground group grow growth guess gun guy hair half hand hang happen
+happy hard have head health hear heart heat heavy help here high history hit hold home hope hospital hot hotel hour
+house however huge human hundred husband idea identify image imagine impact important improve include increase
+indeed indicate individual industry information inside instead interest interview into investment involve issue
+item itself job join just keep key kid kind kitchen know knowledge land language large last late later laugh law
+lawyer lay lead leader learn least leave left leg legal less let letter level lie life light like likely line list
+listen little live local long look lose loss lot love low machine magazine main maintain major majority make manage
+management manager many market marriage material matter may maybe mean measure media medical meet meeting member
+memory mention message method middle might military million mind minute miss mission model modern moment money
+month more morning most mother mouth move movement movie much music must myself name nation national natural nature
+near nearly necessary need network never new news newspaper next nice night none north note nothing notice now
+number occur off offer office officer official often oil old once one only onto open operation opportunity option
+order organization other others outside over own owner page pain painting paper parent part participant particular
+partner party pass past patient pattern pay peace people per perform perhaps period person personal phone physical
+pick picture piece place plan plant play player point police policy political poor popular population position
+positive possible power practice prepare present president pressure pretty prevent price private probably problem
+process produce product production professional program project property protect prove provide public pull purpose
+push put quality question quickly quite race radio raise range rate rather reach read ready real reality realize
+really reason receive recent recently recognize record red reduce reflect region relate relationship religious
+remain remember remove report represent require research resource respond response rest result return reveal rich
+right rise risk road rock role room rule run safe same save say scene school science scientist score sea season
+seat second section security see seek seem sell send senior sense series serious serve service set seven several
+shake share she shoot short shot should shoulder show side sign significant similar simple simply since sing single
+sister sit site situation six size skill skin small smile social society soldier some someone something sometimes
+son song soon sort sound source south space speak special specific speech spend sport spring staff stage stand
+standard star start state statement station stay step still stock stop store story strategy street strong structure
+student study stuff style subject success successful such suddenly suffer suggest summer support sure surface system
+table take talk task tax teach teacher team technology television tell ten tend term test than thank that their
+them then theory there these they thing think third this those though thought thousand threat three through
+throughout throw thus time today together tonight too top total tough toward town trade traditional training travel
+treat treatment tree trial trip trouble true truth try turn type under understand unit until upon use usually value
+various very victim view violence visit voice vote wait walk wall want war watch water way weapon wear week weight
+well west western what whatever wheel when where whether which while white who whole whom whose why wide wife will
+win wind window wish with within without woman wonder word work worker world worry would write writer wrong yard
+yeah year yes yet you young your yourself
+""".split())
+
+
+class SentenceGenerator:
+    """
+    Generate random sentences from a built-in word table, a lightweight replacement of Faker's `sentence`.
+    Sentences have the same shape: a number of words between 60% and 140% of the one requested,
+    a capitalized first word and a final period. Random numbers are drawn as one block of bytes
+    per batch of sentences rather than one call per word.
+    """
+    STREAM_BATCH_SIZE = 64
+
+    def __init__(self, seed: int = None, words: tuple = WORDS) -> None:
+        """
+        Constructor of the SentenceGenerator class.
+
+        Attributes
+        ----------
+        seed : int
+            The seed of the random generator, to generate the same sentences on each run.
+        words : tuple
+            The words the sentences are made of.
+        """
+        self.random = random.Random(seed)
+        self.words = words
+
+    def sentence(self, nb_words: int = 6) -> str:
+        """
+        Generate a random sentence.
+
+        Parameters
+        ----------
+        nb_words : int
+            The average number of words of the sentence.
+
+        Returns
+        -------
+        str
+            The sentence.
+        """
+        return self.sentences(1, nb_words)[0]
+
+    def sentences(self, number_of_sentences: int, nb_words: int = 6) -> list:
+        """
+        Generate a batch of random sentences.
+
+        Parameters
+        ----------
+        number_of_sentences : int
+            The number of sentences to generate.
+        nb_words : int
+            The average number of words of each sentence.
+
+        Returns
+        -------
+        list
+            The sentences.
+        """
+        if number_of_sentences <= 0:
+            return []
+        words = self.words
+        size = len(words)
+        ratios = self.__numbers(number_of_sentences)
+        counts = [max(1, nb_words * (60 + ratio % 81) // 100) for ratio in ratios]
+        indexes = self.__numbers(sum(counts))
+        picked = [words[index % size] for index in indexes]
+        
+        sentences = []
+        start = 0
+        for count in counts:
+            sentence = " ".join(picked[start:start + count])
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+            start += count
+        return sentences
+
+    def __numbers(self, count: int) -> array:
+        """
+        Draw random 16-bit numbers, two random bytes per number read as little-endian so that a
+        seed gives the same numbers on every host. The modulo bias of the callers is below 1%.
+
+        Parameters
+        ----------
+        count : int
+            The number of numbers.
+
+        Returns
+        -------
+        array
+            The numbers.
+        """
+        numbers = array("H", self.random.randbytes(2 * count))
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        return numbers
+
+    def stream(self, nb_words: int = 6) -> Iterator[str]:
+        """
+        Lazily generate random sentences, one at a time and without end.
+
+        Parameters
+        ----------
+        nb_words : int
+            The average number of words of each sentence.
+
+        Yields
+        ------
+        str
+            The next sentence.
+        """
+        while True:
+            yield from self.sentences(self.STREAM_BATCH_SIZE, nb_words)
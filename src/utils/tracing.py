@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import resource
+import threading
+import contextvars
+from loguru import logger
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Span:
+    """
+    A timed operation of the workflow: a phase, a command or an HTTP call.
+    The CPU time used meanwhile is measured for the whole process, the spans running
+    concurrently on other threads share it.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: str, kind: str, attributes: dict) -> None:
+        """
+        Constructor of the Span class, the span starts right away.
+
+        Attributes
+        ----------
+        name : str
+            The name of the operation e.g. "clone" or "git push".
+        trace_id : str
+            The identifier shared by every span of a workflow run, 32 hexadecimal characters.
+        parent_id : str
+            The identifier of the enclosing span, None for the root span.
+        kind : str
+            "internal" for local operations, "client" for calls to the GitHub API.
+        attributes : dict
+            The details of the operation e.g. the exit code or the byte counts.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self.usage = None
+        self.__start = time.perf_counter_ns()
+        self.__start_usage = Span.__rusage()
+
+    @staticmethod
+    def __rusage() -> tuple:
+        """
+        Get the CPU times of the process and of its finished child processes, e.g. `git`.
+
+        Returns
+        -------
+        tuple
+            The user and system CPU times of the process then of its children, in seconds.
+        """
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return own.ru_utime, own.ru_stime, children.ru_utime, children.ru_stime
+
+    def set(self, **attributes) -> None:
+        """
+        Add attributes to the span.
+        """
+        self.attributes.update(attributes)
+
+    def end(self) -> None:
+        """
+        End the span, its duration is measured with a monotonic clock.
+        """
+        self.end_time = self.start_time + time.perf_counter_ns() - self.__start
+        usage = [end - start for start, end in zip(self.__start_usage, Span.__rusage())]
+        self.usage = dict(zip(("user", "system", "children_user", "children_system"), usage))
+
+    @property
+    def duration(self) -> float:
+        """
+        The duration of the span in seconds.
+        """
+        return (self.end_time - self.start_time) / 1e9
+
+    def to_dict(self) -> dict:
+        """
+        Get the span as a JSON serializable dictionary.
+
+        Returns
+        -------
+        dict
+            The span.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    Collect the spans of the workflow runs of the process.
+    Spans are nested with a context variable, which follows `asyncio` tasks and `asyncio.to_thread`,
+    each workflow run started from a fresh context gets its own trace.
+    """
+    FORMATS = ("jsonl", "otlp")
+    # OpenTelemetry span kinds and status codes
+    OTLP_KINDS = {"internal": 1, "client": 3}
+    OTLP_STATUS_CODES = {"ok": 1, "error": 2}
+
+    def __init__(self, service_name: str = "super-dev") -> None:
+        """
+        Constructor of the Tracer class.
+
+        Attributes
+        ----------
+        service_name : str
+            The name of the service reported in the OpenTelemetry resource.
+        """
+        self.service_name = service_name
+        self.spans = []
+        self.lock = threading.Lock()
+        self.current = contextvars.ContextVar("current_span", default=None)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+        """
+        Record a span around a block of code, as a child of the current span.
+        An exception leaving the block marks the span as failed and is raised again.
+
+        Parameters
+        ----------
+        name : str
+            The name of the operation.
+        kind : str
+            "internal" for local operations, "client" for calls to the GitHub API.
+        **attributes
+            The details of the operation known before it starts.
+
+        Yields
+        ------
+        Span
+            The span, to add attributes known once the operation ran.
+        """
+        parent = self.current.get()
+        span = Span(name, parent.trace_id if parent else os.urandom(16).hex(), parent.span_id if parent else None, kind, attributes)
+        token = self.current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end()
+            self.current.reset(token)
+            with self.lock:
+                self.spans.append(span)
+
+    def pop_spans(self) -> list:
+        """
+        Get the finished spans and forget them, so a long running process does not accumulate them.
+
+        Returns
+        -------
+        list
+            The finished spans, in the order they ended.
+        """
+        with self.lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def summary(self, spans: list) -> str:
+        """
+        Build a table of the spans aggregated by name, the slowest operations first.
+
+        Parameters
+        ----------
+        spans : list
+            The spans to summarize.
+
+        Returns
+        -------
+        str
+            The table, with the count, errors, total, mean and max duration of each operation.
+        """
+        operations = {}
+        for span in spans:
+            operations.setdefault(span.name, []).append(span)
+        lines = [f"{'operation':<56} {'count':>6} {'errors':>6} {'total':>9} {'mean':>9} {'max':>9}"]
+        for name, group in sorted(operations.items(), key=lambda item: -sum(span.duration for span in item[1])):
+            durations = [span.duration for span in group]
+            errors = sum(span.status == "error" for span in group)
+            lines.append(f"{name[:56]:<56} {len(group):>6} {errors:>6} {sum(durations):>8.3f}s {sum(durations) / len(durations):>8.3f}s {max(durations):>8.3f}s")
+        return "\n".join(lines)
+
+    def export(self, spans: list, path: str, format: str = "jsonl") -> None:
+        """
+        Write spans to a file.
+
+        Parameters
+        ----------
+        spans : list
+            The spans to export.
+        path : str
+            The path of the file. JSON lines are appended to it, an OTLP document replaces it.
+        format : str
+            "jsonl" for one span per line, "otlp" for an OpenTelemetry OTLP/JSON document
+            that can be sent as is to the `/v1/traces` endpoint of a collector.
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported trace format '{format}', expected one of {self.FORMATS}.")
+        if format == "jsonl":
+            with open(path, "a") as f:
+                for span in spans:
+                    f.write(json.dumps(span.to_dict()) + "\n")
+        else:
+            with open(path, "w") as f:
+                json.dump(self.__otlp(spans), f)
+        logger.info(f"{len(spans)} spans exported to {path}.")
+
+    def __otlp(self, spans: list) -> dict:
+        """
+        Convert spans to an OTLP/JSON traces document.
+
+        Parameters
+        ----------
+        spans : list
+            The spans to convert.
+
+        Returns
+        -------
+        dict
+            The document.
+        """
+        def value(attribute) -> dict:
+            if isinstance(attribute, bool):
+                return {"boolValue": attribute}
+            if isinstance(attribute, int):
+                return {"intValue": str(attribute)}
+            if isinstance(attribute, float):
+                return {"doubleValue": attribute}
+            return {"stringValue": str(attribute)}
+
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": self.OTLP_KINDS[span.kind],
+                "startTimeUnixNano": str(span.start_time),
+                "endTimeUnixNano": str(span.end_time),
+                "attributes": [{"key": key, "value": value(attribute)} for key, attribute in span.attributes.items() if attribute is not None],
+                "status": {"code": self.OTLP_STATUS_CODES[span.status], **({"message": span.error} if span.error else {})}
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "super-dev.tracing"}, "spans": otlp_spans}]
+            }]
+        }
+
+
+# Tracer shared by the whole process
+tracer = Tracer()
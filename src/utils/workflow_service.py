@@ -0,0 +1,294 @@
+import json
+import uuid
+import queue
+import threading
+from datetime import date, datetime, timezone
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import urlsplit, parse_qs
+from loguru import logger
+
+
+class WorkflowService:
+    """
+    HTTP service running the workflow on request from a long running process, which keeps the
+    imported modules, the pooled GitHub connections and the clone between runs: a trigger only
+    costs the fetch of the new commits and the work itself.
+    The runs of a repository are queued and run one at a time, a trigger arriving while a run with
+    the same options is already queued for the repository joins it. Between runs, the clone can be
+    refreshed in the background so that the next run has little left to fetch.
+    - `POST /runs` queues a run and answers 202 with it, or waits for it with `?wait=true` and
+      answers 200 or 500. The JSON body may set the "repository", the configured one by default,
+      and the workflow options passed to the run, e.g. {"workflow": "async"}, or {"workflow": "backfill"}
+      with the "backfill_from" and "backfill_to" dates. Invalid options are answered with a 400.
+    - `GET /runs/<id>` answers with a run.
+    - `GET /health` answers with the number of queued runs.
+    """
+    HISTORY_SIZE = 100
+    WORKFLOWS = ("daily", "async", "backfill")
+
+    def __init__(
+            self,
+            run: Callable[[str, dict], int],
+            repositories: list,
+            host: str = "127.0.0.1",
+            port: int = 8080,
+            max_queued: int = 10,
+            refresh: Callable[[str], None] = None,
+            refresh_interval: float = 0.0,
+            token: str = None
+        ) -> None:
+        """
+        Constructor of the WorkflowService class.
+
+        Attributes
+        ----------
+        run : Callable[[str, dict], int]
+            Run the workflow of a repository with the options of the request, and return the number of commits.
+        repositories : list
+            The repositories served e.g. "owner/name", the first one is the default.
+        host : str
+            The address the service listens on, "0.0.0.0" in a container.
+        port : int
+            The port the service listens on.
+        max_queued : int
+            The number of runs waiting for a repository, more triggers are refused with a 503.
+        refresh : Callable[[str], None]
+            Fetch the clone of a repository between runs, None to never refresh it.
+        refresh_interval : float
+            The idle time after which the clone is refreshed, in seconds, 0 to never refresh it.
+        token : str
+            The bearer token the requests must send, None to accept every request
+            e.g. when the platform authenticates them.
+        """
+        self.run = run
+        self.repositories = list(repositories)
+        self.max_queued = max_queued
+        self.refresh = refresh
+        self.refresh_interval = refresh_interval
+        self.token = token
+        self.runs = OrderedDict()
+        self.lock = threading.Lock()
+        self.lanes = {repository: {"queue": queue.Queue(), "queued": None} for repository in self.repositories}
+        self.server = ThreadingHTTPServer((host, port), self.__handler())
+        self.server.daemon_threads = True
+
+    def serve_forever(self) -> None:
+        """
+        Start a worker for each repository then answer the requests until the process is stopped.
+        """
+        for repository in self.repositories:
+            threading.Thread(target=self.__work, args=(repository,), name=f"worker {repository}", daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Serving {', '.join(self.repositories)} on http://{host}:{port}...")
+        self.server.serve_forever()
+
+    def shutdown(self) -> None:
+        """
+        Stop answering the requests, the runs in progress are not interrupted.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def submit(self, repository: str, options: dict) -> dict:
+        """
+        Queue a run of a repository, or join the run already waiting for it.
+
+        Parameters
+        ----------
+        repository : str
+            The repository e.g. "owner/name".
+        options : dict
+            The workflow options of the run.
+
+        Returns
+        -------
+        dict
+            The run, None if the queue of the repository is full.
+        """
+        lane = self.lanes[repository]
+        with self.lock:
+            queued = lane["queued"]
+            if queued and queued["status"] == "queued" and queued["options"] == options:
+                logger.info(f"Run {queued['id']} of {repository} is already queued, joining it.")
+                return queued
+            if lane["queue"].qsize() >= self.max_queued:
+                return None
+            run = {
+                "id": uuid.uuid4().hex[:12],
+                "repository": repository,
+                "options": options,
+                "status": "queued",
+                "submitted_at": datetime.now(timezone.utc).isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "commits": None,
+                "error": None,
+                "done": threading.Event()
+            }
+            self.runs[run["id"]] = run
+            while len(self.runs) > self.HISTORY_SIZE:
+                self.runs.popitem(last=False)
+            lane["queued"] = run
+            lane["queue"].put(run)
+        logger.info(f"Run {run['id']} of {repository} queued.")
+        return run
+
+    def __work(self, repository: str) -> None:
+        """
+        Run the queued runs of a repository one at a time, and refresh its clone when idle.
+
+        Parameters
+        ----------
+        repository : str
+            The repository.
+        """
+        lane = self.lanes[repository]
+        while True:
+            try:
+                run = lane["queue"].get(timeout=self.refresh_interval if self.refresh and self.refresh_interval else None)
+            except queue.Empty:
+                try:
+                    self.refresh(repository)
+                except Exception as e:
+                    # A stale clone only makes the next run fetch more
+                    logger.warning(f"Failed to refresh the clone of {repository}: {e}")
+                continue
+            with self.lock:
+                if lane["queued"] is run:
+                    lane["queued"] = None
+                run["status"] = "running"
+                run["started_at"] = datetime.now(timezone.utc).isoformat()
+            try:
+                commits = self.run(repository, run["options"])
+                with self.lock:
+                    run["status"] = "succeeded"
+                    run["commits"] = commits
+            except Exception as e:
+                logger.error(f"Run {run['id']} of {repository} failed: {e}")
+                with self.lock:
+                    run["status"] = "failed"
+                    run["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                with self.lock:
+                    run["finished_at"] = datetime.now(timezone.utc).isoformat()
+                run["done"].set()
+
+    def validate(self, options: dict) -> None:
+        """
+        Check the workflow options of a request, before the run is queued.
+
+        Parameters
+        ----------
+        options : dict
+            The workflow options.
+        """
+        unknown = set(options) - {"workflow", "backfill_from", "backfill_to"}
+        if unknown:
+            raise ValueError(f"unsupported options {sorted(unknown)}")
+        workflow = options.get("workflow", "daily")
+        if workflow not in self.WORKFLOWS:
+            raise ValueError(f"unsupported workflow '{workflow}', expected one of {self.WORKFLOWS}")
+        if workflow == "backfill" and not options.get("backfill_from"):
+            raise ValueError("the backfill workflow requires 'backfill_from'")
+        for option in ("backfill_from", "backfill_to"):
+            if options.get(option) is not None:
+                if workflow != "backfill":
+                    raise ValueError(f"'{option}' is only used by the backfill workflow")
+                if not isinstance(options[option], str):
+                    raise ValueError(f"'{option}' must be a YYYY-MM-DD date")
+                date.fromisoformat(options[option])
+
+    def describe(self, run: dict) -> dict:
+        """
+        Get a run as a JSON serializable dictionary.
+
+        Parameters
+        ----------
+        run : dict
+            The run.
+
+        Returns
+        -------
+        dict
+            The run without its completion event.
+        """
+        with self.lock:
+            return {key: value for key, value in run.items() if key != "done"}
+
+    def __handler(self) -> type:
+        """
+        Build the request handler class of the server, bound to this service.
+
+        Returns
+        -------
+        type
+            The handler class.
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 503:
+                    self.send_header("Retry-After", "60")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def authorized(self) -> bool:
+                if service.token and self.headers.get("Authorization") != f"Bearer {service.token}":
+                    self.send(401, {"message": "Bad credentials"})
+                    return False
+                return True
+
+            def do_GET(self) -> None:
+                path = urlsplit(self.path).path.rstrip("/")
+                if path == "/health":
+                    queued = {repository: lane["queue"].qsize() for repository, lane in service.lanes.items()}
+                    return self.send(200, {"status": "ok", "queued": queued})
+                if not self.authorized():
+                    return
+                if path.startswith("/runs/"):
+                    with service.lock:
+                        run = service.runs.get(path.removeprefix("/runs/"))
+                    if run:
+                        return self.send(200, service.describe(run))
+                self.send(404, {"message": "Not Found"})
+
+            def do_POST(self) -> None:
+                url = urlsplit(self.path)
+                if url.path.rstrip("/") != "/runs":
+                    return self.send(404, {"message": "Not Found"})
+                if not self.authorized():
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    options = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(options, dict):
+                        raise ValueError("expected a JSON object")
+                    repository = options.pop("repository", service.repositories[0])
+                    if not isinstance(repository, str):
+                        raise ValueError("'repository' must be a string")
+                    service.validate(options)
+                except ValueError as e:
+                    return self.send(400, {"message": f"Invalid body: {e}"})
+                if repository not in service.lanes:
+                    return self.send(404, {"message": f"Repository '{repository}' is not served."})
+                run = service.submit(repository, options)
+                if run is None:
+                    return self.send(503, {"message": f"Too many runs queued for {repository}."})
+                if parse_qs(url.query).get("wait", ["false"])[0].lower() == "true":
+                    run["done"].wait()
+                    public = service.describe(run)
+                    return self.send(200 if public["status"] == "succeeded" else 500, public)
+                self.send(202, service.describe(run))
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug(f"{self.address_string()} - {format % args}")
+
+        return Handler